@@ -0,0 +1,37 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import Convertor
+from src.encoding import PROFILES, benchmark
+
+parser = argparse.ArgumentParser(
+    prog='Encoding Benchmark',
+    description='compare frame encoding profiles on frames of a real conversion')
+
+parser.add_argument('cvt_file', metavar='convertor')
+parser.add_argument('-n', '--frames', type=int, default=200)
+parser.add_argument('-p', '--profile', action='append', choices=PROFILES, help='profiles to run, defaults to all')
+parser.add_argument('-o', '--output', metavar='json')
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    convertor = Convertor.from_file(args.cvt_file)
+    frames = convertor.sample(args.frames)
+    if not frames:
+        raise SystemExit('no frames decoded')
+
+    results = benchmark(frames, args.profile)
+    raw = frames[0].nbytes
+    print(f'{len(frames)} frames of shape {frames[0].shape}')
+    print(f'{"profile":<16}{"encode f/s":>12}{"bytes/frame":>14}{"ratio":>8}{"decode f/s":>12}  lossless')
+    for result in results:
+        print('{profile:<16}{encode_fps:>12.1f}{bytes_per_frame:>14.0f}{ratio:>8.2f}{decode_fps:>12.1f}  {lossless}'.format(
+            ratio=result['bytes_per_frame'] / raw, **result))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as ofile:
+            json.dump({'cvt_file': args.cvt_file, 'shape': frames[0].shape, 'results': results}, ofile, indent=2)
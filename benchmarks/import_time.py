@@ -0,0 +1,62 @@
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET = 0.5
+HEAVY = ('pyautogui', 'matplotlib', 'scipy')
+line_re = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def measure(module: str):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if ms := line_re.match(line):
+            modules[ms.group(4)] = int(ms.group(2)) / 1e6
+            if len(ms.group(3)) == 1:
+                total += int(ms.group(2)) / 1e6
+
+    return total, modules
+
+parser = argparse.ArgumentParser(
+    prog='Import Benchmark',
+    description='measure the import time of the convertor package against a budget')
+
+parser.add_argument('-m', '--module', default='src')
+parser.add_argument('-n', '--repeat', type=int, default=5)
+parser.add_argument('-b', '--budget', type=float, default=BUDGET, metavar='seconds')
+parser.add_argument('-o', '--output', metavar='json')
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    totals = [total for total, _ in runs]
+    modules = runs[-1][1]
+    median = statistics.median(totals)
+    heavy = sorted(name for name in modules if name.split('.')[0] in HEAVY)
+    slowest = sorted(((name, time) for name, time in modules.items() if '.' not in name), key=lambda i: -i[1])[:10]
+
+    print(f'import {args.module}: median {median * 1000:.1f} ms over {args.repeat} runs (budget {args.budget * 1000:.0f} ms)')
+    for name, time in slowest:
+        print(f'  {name:<24} {time * 1000:8.1f} ms')
+    if heavy:
+        print('heavy modules imported eagerly: {}'.format(', '.join(heavy)))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as ofile:
+            json.dump({
+                'module': args.module,
+                'median': median,
+                'runs': totals,
+                'budget': args.budget,
+                'slowest': dict(slowest),
+                'heavy': heavy}, ofile, indent=2)
+
+    sys.exit(0 if median <= args.budget and not heavy else 1)
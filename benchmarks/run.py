@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from src import Convertor
+from src.file import File
+from src.cache import BeatmapCache
+from src.label import LabelTable
+from src.timeline import Timeline
+from synthetic import generate_osu, generate_video
+
+def timed(action, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        action()
+        runs.append(time.perf_counter() - begin)
+
+    return {'median': statistics.median(runs), 'min': min(runs), 'runs': runs}
+
+def run(directory: str, args) -> dict:
+    osu = os.path.join(directory, 'map.osu')
+    video = os.path.join(directory, 'video.mp4')
+    end = generate_osu(
+        osu, args.circles, args.b_sliders, args.p_sliders, args.l_sliders, args.spinners, args.timing_points, seed=args.seed)
+    seconds = min(end / 1000 + 1, args.video_seconds)
+    generate_video(video, seconds, args.size)
+
+    file = File(osu)
+    cache = BeatmapCache(os.path.join(directory, 'cache'))
+    File(osu, cache)
+
+    def paths():
+        file.__dict__.pop('objects', None)
+        return file.objects
+
+    def convertor():
+        result = Convertor(osu, video, size=args.size, start=0, end=int(seconds * 1000), cache=cache)
+        result.progress = False
+        return result
+
+    def iterate():
+        for _ in convertor():
+            pass
+
+    stages = {
+        'parse': lambda: File(osu),
+        'paths': paths,
+        'timeline': lambda: Timeline.from_objects(file.objects),
+        'cache_load': lambda: File(osu, cache),
+        'labels': lambda: LabelTable.build(file.timeline, 0, file.n),
+        'iterate': iterate,
+        'to_data': lambda: convertor().to_data(os.path.join(directory, 'data.zip'), args.workers),
+        'write': lambda: convertor().write(os.path.join(directory, 'render.mp4'), args.segments),
+    }
+    results = {}
+    for name, action in stages.items():
+        if args.stage and name not in args.stage:
+            continue
+
+        results[name] = timed(action, args.repeat)
+        print(f'{name:<12}{results[name]["median"] * 1000:>10.1f} ms', file=sys.stderr)
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count()},
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'samples': len(file.timeline),
+        'frames': int(seconds * 60),
+        'results': results}
+
+def compare(report: dict, baseline: dict, threshold: float) -> bool:
+    "print the change of every stage against a baseline report, True when nothing regressed"
+    ok = True
+    for name, result in report['results'].items():
+        if name not in baseline['results']:
+            continue
+
+        ratio = result['median'] / baseline['results'][name]['median']
+        slower = ratio > 1 + threshold
+        ok &= not slower
+        print(f'{name:<12}{ratio:>8.2f}x{"  REGRESSION" if slower else ""}')
+
+    return ok
+
+parser = argparse.ArgumentParser(
+    prog='Convertor Benchmark',
+    description='time parsing, path generation, labeling and export on synthetic data')
+
+parser.add_argument('-o', '--output', metavar='json', help='write the report here')
+parser.add_argument('-c', '--compare', metavar='json', help='baseline report to compare against')
+parser.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown before a stage counts as a regression')
+parser.add_argument('-s', '--stage', action='append', help='only run these stages')
+parser.add_argument('-n', '--repeat', type=int, default=3)
+parser.add_argument('--circles', type=int, default=500)
+parser.add_argument('--b-sliders', type=int, default=200)
+parser.add_argument('--p-sliders', type=int, default=200)
+parser.add_argument('--l-sliders', type=int, default=200)
+parser.add_argument('--spinners', type=int, default=10)
+parser.add_argument('--timing-points', type=int, default=50)
+parser.add_argument('--seed', type=int, default=0)
+parser.add_argument('--video-seconds', type=float, default=20)
+parser.add_argument('--size', type=lambda i: tuple(map(int, i.split(','))), default=(640, 360), metavar='w,h')
+parser.add_argument('-j', '--workers', type=int)
+parser.add_argument('--segments', type=int, default=1)
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='convertor-bench-')
+    try:
+        report = run(directory, args)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as ofile:
+            json.dump(report, ofile, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as cfile:
+            raise SystemExit(0 if compare(report, json.load(cfile), args.threshold) else 1)
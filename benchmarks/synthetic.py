@@ -0,0 +1,101 @@
+import random
+
+import cv2
+import numpy as np
+
+HEADER = '''osu file format v14
+
+[General]
+AudioFilename: audio.mp3
+Mode: 0
+
+[Metadata]
+Title:Synthetic
+Artist:Benchmark
+Creator:benchmarks/synthetic.py
+Version:{version}
+BeatmapID:0
+BeatmapSetID:-1
+
+[Difficulty]
+HPDrainRate:5
+CircleSize:4
+OverallDifficulty:8
+ApproachRate:9
+SliderMultiplier:{slider_multiplier}
+SliderTickRate:1
+
+[TimingPoints]
+'''
+
+def point(rng: random.Random) -> tuple[int, int]:
+    return rng.randint(0, 512), rng.randint(0, 384)
+
+def slider_points(rng: random.Random, kind: str) -> str:
+    match kind:
+        case 'L':
+            count = rng.randint(1, 3)
+        case 'P':
+            count = 2
+        case _:
+            count = rng.randint(2, 8)
+
+    points = [point(rng) for _ in range(count)]
+    if kind == 'B' and count > 3 and rng.random() < 0.5:
+        # a red anchor splits the curve into two segments
+        points.insert(count // 2, points[count // 2])
+
+    return kind + '|' + '|'.join(f'{x}:{y}' for x, y in points)
+
+def generate_osu(path: str, circles=500, b_sliders=200, p_sliders=200, l_sliders=200, spinners=10,
+                 timing_points=50, gap=300, seed=0, bpm=180, slider_multiplier=1.6) -> int:
+    "write a random but valid .osu and return the time of its last object"
+    rng = random.Random(seed)
+    kinds = ['circle'] * circles + ['B'] * b_sliders + ['P'] * p_sliders + ['L'] * l_sliders + ['spin'] * spinners
+    rng.shuffle(kinds)
+
+    objects = []
+    time = 1000
+    for kind in kinds:
+        x, y = point(rng)
+        match kind:
+            case 'circle':
+                objects.append(f'{x},{y},{time},1,0,0:0:0:0:')
+                time += gap
+            case 'spin':
+                end = time + rng.randint(1000, 4000)
+                objects.append(f'256,192,{time},12,0,{end},0:0:0:0:')
+                time = end + gap
+            case _:
+                repeats = rng.randint(1, 3)
+                length = rng.randint(50, 400)
+                objects.append(f'{x},{y},{time},2,0,{slider_points(rng, kind)},{repeats},{length}')
+                time += gap * (1 + repeats)
+
+    step = 60000 / bpm
+    lines = [f'1000,{step},4,2,0,60,1,0']
+    for i in range(1, timing_points):
+        start = 1000 + (time - 1000) * i // timing_points
+        if rng.random() < 0.2:
+            lines.append(f'{start},{step},4,2,0,60,1,0')
+        else:
+            lines.append(f'{start},{-rng.choice((50, 75, 100, 150, 200))},4,2,0,60,0,0')
+
+    with open(path, 'w', encoding='utf-8') as ofile:
+        ofile.write(HEADER.format(version=f'{len(kinds)} objects', slider_multiplier=slider_multiplier))
+        ofile.write('\n'.join(lines) + '\n\n[HitObjects]\n')
+        ofile.write('\n'.join(objects) + '\n')
+
+    return time
+
+def generate_video(path: str, seconds: float, size=(640, 360), fps=60, fourcc='mp4v'):
+    "a video whose frames differ from each other enough to exercise the encoders"
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    width, height = size
+    base = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(int(seconds * fps)):
+        frame = np.roll(base, i * 3, axis=1)
+        cv2.putText(frame, str(i), (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+
+    writer.release()
@@ -2,34 +2,96 @@ import cv2
 import time
 import argparse
 
-from src import Convertor, PixelConvertor
+from src import Convertor
+from src.convertor import LOSSLESS_FOURCCS
+from src.batch import run_batch
+from src.encoding import PROFILES
+from src.profiler import Profiler
 
-convert = PixelConvertor.convert
 parser = argparse.ArgumentParser(
     prog='Osu Convertor',
     description='convert the video and ".osu" file to combine video or AI data')
 
 parser.add_argument('cvt_file', metavar='convertor')
 parser.add_argument('-w', '--write', metavar='output')
+parser.add_argument('--segments', type=int, default=1, metavar='count',
+                    help='render --write in that many parallel segments; needs ffmpeg and a lossless --fourcc, otherwise renders sequentially')
+parser.add_argument('--fourcc', default='mp4v', help='codec of --write, FFV1, HFYU or MPNG for --segments; only MPNG segments can be joined into a .mp4, use .mkv for the others')
 parser.add_argument('-c', '--convert', metavar='output')
+parser.add_argument('-e', '--encoding', default='png', choices=PROFILES, help='frame encoding profile of --convert')
+parser.add_argument('-l', '--labels', metavar='output', help='zip with only position.json and click.json, the video is not read so --fps (or fps= or source_fps= in the cvt file) is required')
+parser.add_argument('-s', '--shards', metavar='directory')
+parser.add_argument('--shard-size', type=int, default=1024, metavar='frames')
 parser.add_argument('-p', '--preview', action='store_const', const=True, default=False)
+parser.add_argument('--start', type=int, metavar='ms', help='beatmap time to start from, defaults to the first hit object')
+parser.add_argument('--end', type=int, metavar='ms', help='beatmap time to stop at')
+parser.add_argument('--fps', type=float, help='output frame rate, frames of a faster video are dropped without decoding; defaults to the video rate')
+parser.add_argument('--tolerance', type=float, metavar='px', help='bezier slider flatness in osu! pixels, smaller is finer; defaults to 0.25')
+parser.add_argument('--crop', type=int, metavar='margin', help='crop frames to the playfield plus a margin in pixels')
+parser.add_argument('--resize', type=lambda i: tuple(map(int, i.split(','))), metavar='w,h')
+parser.add_argument('--gray', action='store_const', const=True, default=None)
+parser.add_argument('-j', '--workers', type=int, metavar='count', help='image encoding threads, defaults to the cpu count')
+parser.add_argument('--encoders', type=int, metavar='count',
+                    help='encode --convert in that many processes fed through shared memory instead of threads')
+parser.add_argument('--checkpoint', type=int, metavar='frames', help='save progress of --convert every that many frames and resume from it')
+parser.add_argument('--no-cache', dest='cache', action='store_const', const=False, default=None,
+                    help='parse the .osu again instead of using the beatmap cache')
+parser.add_argument('--profile', metavar='json',
+                    help='time every stage and write the report here, also shown next to the progress bar; not for --batch')
+parser.add_argument('-b', '--batch', action='store_const', const=True, default=False,
+                    help='treat convertor as a directory or glob of .cvt files and the outputs as directories')
+parser.add_argument('--processes', type=int, metavar='count', help='batch worker processes, defaults to the cpu count')
+parser.add_argument('--manifest', default='batch.json', metavar='json', help='batch status file, completed jobs are skipped on restart')
 
-args = parser.parse_args()
-convertor = Convertor.from_file(args.cvt_file)
-if args.write is not None:
-    print('writing mp4 to {}'.format(args.write))
-    convertor.write(args.write)
-
-if args.convert is not None:
-    print('writing zip to {}'.format(args.convert))
-    convertor.to_data(args.convert)
-
-if args.preview:
-    for frame, position in convertor:
-        if position is not None:
-            cv2.rectangle(frame, tuple(convert(position - 15)), tuple(convert(position + 15)), (127, 127, 127), 7)
-
-        cv2.imshow('frame', frame)
-        key = cv2.waitKey(0) & 0xff
-        if key == 27:
-            break
+if __name__ == '__main__':
+    args = parser.parse_args()
+    options = dict(start=args.start, end=args.end, crop=args.crop, resize=args.resize, gray=args.gray, cache=args.cache, fps=args.fps, tolerance=args.tolerance)
+    if args.batch and args.profile is not None:
+        parser.error('--profile cannot follow the --batch worker processes')
+
+    if args.profile is not None:
+        Profiler.enable()
+
+    if args.segments > 1 and args.fourcc not in LOSSLESS_FOURCCS:
+        parser.error('--segments needs a lossless --fourcc ({}), {} segments would not match a sequential render'.format(', '.join(LOSSLESS_FOURCCS), args.fourcc))
+
+    if args.batch:
+        outputs = {mode: path for mode, path in (('write', args.write), ('convert', args.convert), ('labels', args.labels), ('shards', args.shards)) if path is not None}
+        jobs = run_batch(
+            args.cvt_file, outputs, args.manifest, args.processes,
+            workers=args.workers or 1, shard_size=args.shard_size, encoding=args.encoding, **options)
+        failed = [name for name, job in jobs.items() if job['status'] != 'done']
+        print('{} done, {} failed{}'.format(len(jobs) - len(failed), len(failed), ': ' + ', '.join(failed) if failed else ''))
+        raise SystemExit(1 if failed else 0)
+
+    convertor = Convertor.from_file(args.cvt_file, **options)
+    if args.write is not None:
+        print('writing mp4 to {}'.format(args.write))
+        convertor.write(args.write, args.segments, args.fourcc)
+
+    if args.convert is not None:
+        print('writing zip to {}'.format(args.convert))
+        convertor.to_data(args.convert, args.workers, args.checkpoint, args.encoding, args.encoders)
+
+    if args.labels is not None:
+        print('writing labels to {}'.format(args.labels))
+        convertor.to_labels(args.labels)
+
+    if args.shards is not None:
+        print('writing shards to {}'.format(args.shards))
+        convertor.to_shards(args.shards, args.shard_size)
+
+    if args.preview:
+        convert = convertor.mapper.convert
+        for frame, position in convertor:
+            if position is not None:
+                cv2.rectangle(frame, tuple(convert(position - 15)), tuple(convert(position + 15)), (127, 127, 127), 7)
+
+            cv2.imshow('frame', frame)
+            key = cv2.waitKey(0) & 0xff
+            if key == 27:
+                break
+
+    if args.profile is not None:
+        Profiler.save(args.profile)
+        print('profile written to {}'.format(args.profile))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import os
+import glob
+import json
+import time
+import tqdm
+import shutil
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .convertor import Convertor
+
+CONVERTORS = 'convertors'
+EXTENSIONS = {'write': '.mp4', 'convert': '.zip', 'labels': '.zip', 'shards': ''}
+
+def find_jobs(pattern: str) -> list[str]:
+    "names of the .cvt files matching a directory or glob, relative to the convertors folder"
+    path = os.path.join(CONVERTORS, pattern)
+    if os.path.isdir(path):
+        path = os.path.join(path, '*.cvt')
+        
+    return sorted(os.path.relpath(name, CONVERTORS) for name in glob.glob(path, recursive=True) if os.path.isfile(name))
+
+def output_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def remove_output(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def run_job(name: str, outputs: dict[str, str], workers=1, shard_size=1024, encoding='png', **options) -> dict:
+    begin = time.perf_counter()
+    stem = os.path.splitext(name)[0]
+    paths = {mode: os.path.join(directory, stem + EXTENSIONS[mode]) for mode, directory in outputs.items()}
+    try:
+        convertor = Convertor.from_file(name, **options)
+        convertor.progress = False
+        for mode, path in paths.items():
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            match mode:
+                case 'write':
+                    convertor.write(path)
+                case 'convert':
+                    convertor.to_data(path, workers, profile=encoding)
+                case 'labels':
+                    convertor.to_labels(path)
+                case 'shards':
+                    convertor.to_shards(path, shard_size)
+                    
+        status, error = 'done', None
+    except Exception:
+        status, error = 'failed', traceback.format_exc()
+        # a half written output would look finished to whoever reads the directory, the retry writes it again
+        for path in paths.values():
+            remove_output(path)
+        
+    return {
+        'status': status,
+        'error': error,
+        'time': time.perf_counter() - begin,
+        'size': sum(map(output_size, paths.values())),
+        'outputs': paths}
+    
+def save_manifest(path: str, manifest: dict):
+    temp = path + '.tmp'
+    with open(temp, 'w', encoding='utf-8') as mfile:
+        json.dump(manifest, mfile, indent=2)
+        
+    os.replace(temp, path)
+
+def run_batch(pattern: str, outputs: dict[str, str], manifest: str = 'batch.json', processes=None, **options) -> dict:
+    "convert every matching .cvt in a process pool, skipping jobs the manifest already records as done"
+    jobs = {}
+    if os.path.exists(manifest):
+        with open(manifest, 'r', encoding='utf-8') as mfile:
+            jobs = json.load(mfile)['jobs']
+            
+    names = [name for name in find_jobs(pattern) if jobs.get(name, {}).get('status') != 'done']
+    skipped = len(jobs) - sum(name in jobs for name in names)
+    
+    with ProcessPoolExecutor(processes) as pool:
+        futures = {pool.submit(run_job, name, outputs, **options): name for name in names}
+        progress = tqdm.tqdm(as_completed(futures), total=len(futures), postfix={'skipped': skipped})
+        failed = 0
+        for future in progress:
+            name = futures[future]
+            try:
+                jobs[name] = future.result()
+            except Exception:
+                jobs[name] = {'status': 'failed', 'error': traceback.format_exc(), 'time': None, 'size': 0, 'outputs': {}}
+                
+            failed += jobs[name]['status'] != 'done'
+            progress.set_postfix(skipped=skipped, failed=failed)
+            save_manifest(manifest, {'pattern': pattern, 'jobs': jobs})
+            
+    return jobs
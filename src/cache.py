@@ -0,0 +1,105 @@
+from __future__ import annotations
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+
+from .timeline import Timeline
+
+VERSION = 1 # bump whenever path generation changes the sampled timeline
+DIRECTORY = os.environ.get('OSU_CONVERTOR_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'data_convertor'))
+columns = ('time', 'x', 'y', 'object', 'type')
+
+class BeatmapCache:
+    "size-bounded LRU of parsed beatmap timelines, keyed by .osu content hash and algorithm version"
+    def __init__(self, directory: str = DIRECTORY, max_bytes: int = 256 * 1024 ** 2) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        
+    def __repr__(self):
+        return f'<BeatmapCache directory: {self.directory}, max_bytes: {self.max_bytes}>'
+        
+    def key(self, content: bytes, *params) -> str:
+        digest = hashlib.sha1(content)
+        digest.update(repr((VERSION, *params)).encode())
+        return digest.hexdigest()
+    
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+    
+    def load(self, key: str) -> Timeline | None:
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                timeline = Timeline(*(data[column] for column in columns))
+        except Exception:
+            # missing, half evicted or damaged entries are all just a miss
+            return None
+        
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        
+        return timeline
+    
+    def store(self, key: str, timeline: Timeline):
+        "a read-only or full cache directory only skips the write, the conversion goes on without it"
+        temp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(handle, 'wb') as cfile:
+                np.savez(cfile, **{column: getattr(timeline, column) for column in columns})
+                
+            os.replace(temp, self.path(key))
+        except OSError:
+            if temp is not None:
+                try:
+                    os.remove(temp)
+                except OSError:
+                    pass
+            return
+        
+        self.evict()
+        
+    def evict(self):
+        "remove the least recently used entries over max_bytes, other processes may be evicting the same directory"
+        entries = []
+        try:
+            scan = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        
+        for entry in scan:
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            
+            total -= size
+            
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.npz'):
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
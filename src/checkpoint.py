@@ -0,0 +1,63 @@
+from __future__ import annotations
+import os
+import json
+import zipfile
+import warnings
+
+class Checkpoint:
+    "save points of a to_data zip so an interrupted conversion resumes from the last committed frame"
+    def __init__(self, file: str, fingerprint: dict = None) -> None:
+        self.file = file
+        self.path = file + '.ckpt'
+        self.frame = 0
+        # json round trip so tuples compare equal to the lists read back from the header
+        self.fingerprint = json.loads(json.dumps(fingerprint))
+        
+    def __repr__(self):
+        return f'<Checkpoint file: {self.file}, frame: {self.frame}>'
+        
+    def restore(self) -> bool:
+        "roll the zip back to the last checkpoint, False when there is none"
+        if not (os.path.exists(self.path) and os.path.exists(self.file)):
+            return False
+        
+        with open(self.path, 'rb') as cfile:
+            header = json.loads(cfile.readline())
+            tail = cfile.read()
+            
+        if header.get('fingerprint') != self.fingerprint:
+            warnings.warn(f'{self.path} was saved by a different conversion, starting {self.file} over')
+            self.clear()
+            return False
+        
+        # the central directory saved with the checkpoint makes the entries up to data_end a valid zip again
+        with open(self.file, 'r+b') as zfile:
+            zfile.seek(header['data_end'])
+            zfile.write(tail)
+            zfile.truncate()
+            
+        self.frame = header['frame']
+        return True
+    
+    def save(self, zfile: zipfile.ZipFile, frame: int) -> zipfile.ZipFile:
+        "commit every frame written so far and reopen the zip for appending"
+        data_end = zfile.start_dir
+        zfile.close()
+        with open(self.file, 'rb') as zfile:
+            zfile.seek(data_end)
+            tail = zfile.read()
+            
+        header = {'frame': frame, 'data_end': data_end, 'fingerprint': self.fingerprint}
+        temp = self.path + '.tmp'
+        with open(temp, 'wb') as cfile:
+            cfile.write(json.dumps(header).encode() + b'\n' + tail)
+            cfile.flush()
+            os.fsync(cfile.fileno())
+            
+        os.replace(temp, self.path)
+        self.frame = frame
+        return zipfile.ZipFile(self.file, 'a')
+    
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,99 +1,401 @@
+import os
 import cv2
+import shutil
+import tempfile
+import warnings
+import subprocess
+from functools import cached_property
+from math import ceil, floor
 import json
+import hashlib
 import tqdm
 import zipfile
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from .file import File
-from .pixel import Pixel
+from .cache import BeatmapCache
+from .decoder import FrameDecoder
+from .shard import ShardWriter
+from .preprocess import Preprocess
+from .checkpoint import Checkpoint
+from .encoding import EncodingProfile, get_profile
+from .label import LabelTable
+from .stream import FrameBatches
+from .pipeline import run_pipeline
 from .pixel_convertor import PixelConvertor
+from .profiler import Profiler
+
+def draw_box(frame, box):
+    "the overlay of a clicked frame, box from PixelConvertor.boxes"
+    x0, y0, x1, y1 = box
+    cv2.rectangle(frame, (x0, y0), (x1, y1), (127, 127, 127), 7)
+    return frame
+
+def open_writer(file, fourcc, fps, size) -> cv2.VideoWriter:
+    "a VideoWriter that did open, OpenCV otherwise writes nothing without an error"
+    writer = cv2.VideoWriter(file, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    if not writer.isOpened():
+        raise ValueError(f'cannot write {fourcc} video to {file}, its container may not take that codec (try .mkv or .avi)')
+    return writer
+
+def render_segment(osr, file, size, table: LabelTable, fourcc='mp4v', fps=60, prefetch=8) -> int:
+    "render the frames of a label table slice with their overlay into their own video"
+    boxes = PixelConvertor(size).boxes(table.positions).tolist()
+    writer = open_writer(file, fourcc, fps, size)
+    capture = cv2.VideoCapture(osr)
+    count = 0
+    try:
+        with FrameDecoder(capture, prefetch, table.frame) as decoder:
+            for i in range(len(table)):
+                frame = decoder.read()
+                if frame is None: break
+                writer.write(draw_box(frame, boxes[i]) if table.click[i] else frame)
+                count += 1
+    finally:
+        writer.release()
+        capture.release()
+        
+    return count
+
+# every frame of these decodes to exactly what was written, so segments restarting their stream change nothing;
+# each maps to the containers ffmpeg stream copies it into
+LOSSLESS_FOURCCS = {
+    'FFV1': ('.mkv', '.avi', '.mov'),
+    'HFYU': ('.mkv', '.avi', '.mov'),
+    'MPNG': ('.mp4', '.mkv', '.avi', '.mov')}
+
+def stitch(parts: list[str], file, ffmpeg: str):
+    "concatenate segment videos in order by stream copy, never re-encoding them"
+    listing = os.path.join(os.path.dirname(parts[0]), 'parts.txt')
+    with open(listing, 'w', encoding='utf-8') as lfile:
+        lfile.writelines(f"file '{os.path.abspath(part)}'\n" for part in parts)
+        
+    subprocess.run([ffmpeg, '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', listing, '-c', 'copy', file], check=True)
+
+def probe_fps(osr, default=60.) -> float:
+    "frame rate stored in the video, default when it cannot be read"
+    capture = cv2.VideoCapture(osr)
+    fps = capture.get(cv2.CAP_PROP_FPS) if capture.isOpened() else 0
+    capture.release()
+    return fps if fps > 0 else default
 
 class Convertor:
-    def __init__(self, osu, osr, delay=0, size=(1280, 720)) -> None:
-        self.file = File(osu)
-        self.capture = cv2.VideoCapture(osr)
+    progress: bool = True
+    
+    def __init__(self, osu, osr, delay=0, size=(1280, 720), prefetch=8, start=None, end=None, crop=None, resize=None, gray=False, cache=True,
+                 fps=None, source_fps=None, tolerance=None) -> None:
+        "fps is the output frame rate, frames between two output frames of a higher rate source are dropped, tolerance is the bezier flatness in osu! pixels"
+        if cache is True:
+            cache = BeatmapCache()
+            
+        # given rates replace the cached properties below, so only a missing one opens the video
+        if source_fps:
+            self.source_fps = source_fps
+        if fps:
+            self.fps = fps
+        self.osu = osu
+        self.cache = cache or None
+        self.tolerance = tolerance
+        self.osr = osr
         self.size = size
+        self.mapper = PixelConvertor(size)
         self.delay = delay
+        self.prefetch = prefetch
+        self.start = start
+        self.end = end
+        self.crop = crop
+        self.resize = resize
+        self.gray = gray
+        
+    @cached_property
+    def source_fps(self) -> float:
+        "frame rate of the video, read from it on first use"
+        return probe_fps(self.osr)
+    
+    @cached_property
+    def fps(self) -> float:
+        "output frame rate, the video rate unless given"
+        return self.source_fps
+    
+    @cached_property
+    def n(self) -> float:
+        "ms per output frame"
+        return 1 / self.fps * 1000
+    
+    @cached_property
+    def file(self) -> File:
+        "parsed on first use, the timeline is sampled every n ms and cached under that n"
+        return File(self.osu, self.cache, self.n, self.tolerance)
+        
+    @cached_property
+    def capture(self) -> cv2.VideoCapture:
+        "opened on first use, so labels can be produced without the video"
+        return cv2.VideoCapture(self.osr)
         
     def __iter__(self):
-        PixelConvertor.set_size(self.size)
-        n = 1 / 60 * 1000
-        start = -self.delay
-        prev_time = 0
-        frames = 0
-        def next():
-            return self.capture.read()
+        return self.frames()
+    
+    def frames(self, skip=0, step=1):
+        "(frame, position) pairs of the frame range, without decoding the first skip frames, then every step-th frame"
+        table = self.labels()
+        for i, frame in self.decode(skip, step):
+            yield frame, table.pixel(i)
+            
+    def decode(self, skip=0, step=1):
+        "(index into labels(), frame) pairs like frames(), without building a position per frame"
+        table = self.labels()
+        if skip >= len(table) or not self.capture.isOpened(): return
+        with FrameDecoder(self.capture, self.prefetch, table.frame[skip::step]) as decoder:
+            for i in range(skip, len(table), step):
+                frame = decoder.read()
+                if frame is None: return
+                yield i, frame
+                
+    @cached_property
+    def table(self) -> LabelTable:
+        "labels of every frame from the start of the video to the last hit object"
+        return LabelTable.build(self.file.timeline, self.delay, self.n, self.source_fps / self.fps)
+    
+    def labels(self) -> LabelTable:
+        "labels of the frames inside frame_range()"
+        first, last = self.frame_range()
+        return self.table[first:last]
+    
+    def label_arrays(self, table: LabelTable = None) -> tuple[np.ndarray, np.ndarray]:
+        "positions in output pixel space and click flags"
+        table = self.labels() if table is None else table
+        return self.preprocess().positions(self.mapper.convert_many(table.positions)), table.click
+            
+    def frame_range(self) -> tuple[int, int | None]:
+        "video frames covering the start/end window, starting just before the first hit object by default"
+        times = self.file.timeline.time
+        start = self.start
+        if start is None:
+            start = int(times.min()) if len(times) else 0
+            
+        first = max(floor((start + self.delay) / self.n), 0)
+        last = None if self.end is None else max(ceil((self.end + self.delay) / self.n), first)
+        return first, last
+
+    def write(self, file, segments=1, fourcc='mp4v'):
+        "segments > 1 renders that many frame ranges in parallel processes and stitches them in order, it needs a lossless fourcc and ffmpeg"
+        if segments > 1:
+            if fourcc not in LOSSLESS_FOURCCS:
+                raise ValueError(f'segments need a lossless fourcc ({", ".join(LOSSLESS_FOURCCS)}), {fourcc} would differ from a sequential render')
+            if os.path.splitext(file)[1].lower() not in LOSSLESS_FOURCCS[fourcc]:
+                raise ValueError(f'{fourcc} segments can only be joined into {", ".join(LOSSLESS_FOURCCS[fourcc])} files')
+            
+            if ffmpeg := shutil.which('ffmpeg'):
+                return self.write_segments(file, segments, fourcc, ffmpeg)
+            
+            warnings.warn('ffmpeg was not found to stitch the segments, rendering sequentially')
         
-        for position, time in self.file:
-            if not self.capture.isOpened(): return
-            while start + n * frames < time:
-                _, frame = next()
-                frames += 1
-                pos = None
-                if (time - prev_time) / n < 1.3 or (start + n * frames - time) / n > -0.3:
-                    pos = position
-
-                yield frame, pos
-
-            prev_time = time
-
-    def write(self, file):
-        convert = PixelConvertor.convert
-        writer = cv2.VideoWriter(file, cv2.VideoWriter_fourcc(*'mp4v'), 60, self.size)
-        for frame, position in tqdm.tqdm(self):
-            if position is not None:
-                cv2.rectangle(frame, tuple(convert(position - 15)), tuple(convert(position + 15)), (127, 127, 127), 7)
+        table = self.labels()
+        boxes = self.mapper.boxes(table.positions).tolist()
+        writer = open_writer(file, fourcc, self.fps, self.size)
+        bar = tqdm.tqdm(self.decode(), total=len(table), disable=not self.progress)
+        for i, frame in bar:
+            if table.click[i]:
+                with Profiler.stage('overlay'):
+                    draw_box(frame, boxes[i])
+            with Profiler.stage('video.write'):
+                writer.write(frame)
                 
-            writer.write(frame)
+            Profiler.update(bar)
 
         writer.release()
+        
+    def write_segments(self, file, segments, fourcc, ffmpeg):
+        table = self.labels()
+        bounds = np.linspace(0, len(table), segments + 1).astype(int)
+        ext = os.path.splitext(file)[1]
+        directory = tempfile.mkdtemp(prefix='segments-', dir=os.path.dirname(os.path.abspath(file)))
+        try:
+            parts = [os.path.join(directory, f'{k:04d}{ext}') for k in range(segments)]
+            with ProcessPoolExecutor(segments) as pool:
+                futures = [
+                    pool.submit(render_segment, self.osr, part, self.size, table[a:b], fourcc, self.fps, self.prefetch)
+                    for part, a, b in zip(parts, bounds, bounds[1:])]
+                counts = [future.result() for future in tqdm.tqdm(futures, disable=not self.progress)]
+                
+            # a segment cut short by the end of the video ends the output there, like the sequential path
+            used = []
+            for part, count, a, b in zip(parts, counts, bounds, bounds[1:]):
+                used.append(part)
+                if count < b - a: break
+                
+            stitch(used, file, ffmpeg)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
 
-    def to_data(self, file):
-        convert = PixelConvertor.convert
-        positions = []
-        clicks = []
-        with zipfile.ZipFile(file, 'w') as zfile:
-            prev = Pixel(256, 192)
-            length = 0
-            for i, (frame, curr) in tqdm.tqdm(enumerate(self)):
-                _, png = cv2.imencode('.png', frame)
-                zfile.writestr(f'images/{i}.png', png.tostring())
-                if curr is None:
-                    clicks.append(0)
-                else:
-                    clicks.append(1)
-
-                if curr is None and prev is not None:
-                    length += 1
-                elif length != 0:
-                    positions.extend([convert((prev + (curr - prev) * s).round()) for s in np.linspace(1 / length, 1, length)])
-                    length = 0
+    def preprocess(self) -> Preprocess:
+        return Preprocess.playfield(self.mapper, self.crop, self.resize, self.gray)
+    
+    def to_data(self, file, workers=None, checkpoint=None, profile: str | EncodingProfile = 'png', encoders=None):
+        "checkpoint saves every that many frames and resumes from an earlier save of the same file, encoders > 0 encodes in processes"
+        prep = self.preprocess()
+        profile = get_profile(profile)
+        if encoders:
+            return self.to_data_pipeline(file, encoders, checkpoint, prep, profile)
+        
+        def encode(frame):
+            with Profiler.stage('preprocess'):
+                frame = prep.frame(frame)
+            with Profiler.stage('encode') as stage:
+                data = profile.encode(frame)
+                stage.bytes = len(data)
                 
-                if curr is not None:
-                    positions.append(convert(curr))
-                    prev = curr
+            return data
+        
+        workers = workers or os.cpu_count() or 1
+        saves = Checkpoint(file, self.fingerprint(prep, profile)) if checkpoint else None
+        resumed = saves is not None and saves.restore()
+        skip = saves.frame if resumed else 0
+        count = skip
+        pending = deque()
+        zfile = zipfile.ZipFile(file, 'a' if resumed else 'w')
+        try:
+            with ThreadPoolExecutor(workers) as pool:
+                def commit():
+                    i, data = pending.popleft()
+                    with Profiler.stage('encode.wait'):
+                        data = data.result()
+                    with Profiler.stage('zip.write') as stage:
+                        profile.writestr(zfile, i, data)
+                        stage.bytes = len(data)
+
+                bar = tqdm.tqdm(self.decode(skip), initial=skip, disable=not self.progress)
+                for i, frame in bar:
+                    pending.append((i, pool.submit(encode, frame)))
+                    count = i + 1
+                    if len(pending) > 2 * workers:
+                        commit()
+
+                    if saves is not None and count % checkpoint == 0:
+                        while pending:
+                            commit()
+                            
+                        with Profiler.stage('checkpoint'):
+                            zfile = saves.save(zfile, count)
+
+                    Profiler.update(bar)
+
+                while pending:
+                    commit()
 
-            if length != 0:
-                positions.extend([convert((prev + (curr - prev) * s).round()) for s in np.linspace(1 / length, 1, length)])
+            self.write_labels(zfile, count)
+        finally:
+            zfile.close()
+            
+        if saves is not None:
+            saves.clear()
+            
+    def to_data_pipeline(self, file, encoders, checkpoint, prep: Preprocess, profile: EncodingProfile):
+        "to_data with one decoder, encoders encoder and one writer process sharing the frames through shared memory"
+        saves = Checkpoint(file, self.fingerprint(prep, profile)) if checkpoint else None
+        resumed = saves is not None and saves.restore()
+        skip = saves.frame if resumed else 0
+        frames = self.labels().frame[skip:] if self.capture.isOpened() else np.empty(0, dtype=np.int64)
+        count = run_pipeline(
+            self.osr, frames, self.size, prep, profile, file, encoders, 'a' if resumed else 'w', skip, saves, checkpoint,
+            prefetch=self.prefetch, progress=self.progress)
+        
+        with zipfile.ZipFile(file, 'a') as zfile:
+            self.write_labels(zfile, count)
+            
+        if saves is not None:
+            saves.clear()
+            
+    def fingerprint(self, prep: Preprocess, profile: EncodingProfile) -> dict:
+        "everything a resumed to_data must share with the run that saved the checkpoint"
+        try:
+            osr_size = os.path.getsize(self.osr)
+        except OSError:
+            osr_size = None
+            
+        return {
+            'osu': hashlib.sha1(''.join(self.file.content).encode('utf-8')).hexdigest(),
+            'osr': os.path.abspath(self.osr),
+            'osr_size': osr_size,
+            'frame_range': self.frame_range(),
+            'delay': self.delay,
+            'fps': self.fps,
+            'source_fps': self.source_fps,
+            'size': self.size,
+            'profile': profile.name,
+            'preprocess': repr(prep)}
+        
+    def write_labels(self, zfile: zipfile.ZipFile, count: int = None, table: LabelTable = None):
+        positions, clicks = self.label_arrays(table)
+        with Profiler.stage('labels.write') as stage:
+            for name, array in (('position.json', positions), ('click.json', clicks)):
+                data = json.dumps(array[:count].tolist())
+                zfile.writestr(name, data)
+                stage.bytes += len(data)
+        
+    def batches(self, batch_size=32, stride=1, shuffle=0, seed=None, prefetch=2, drop_last=False) -> FrameBatches:
+        "(frames, positions, clicks) batches straight from the video; they are overwritten by later batches, copy what you keep"
+        return FrameBatches(self, batch_size, stride, shuffle, seed, prefetch, drop_last)
+        
+    def sample(self, count: int) -> list[np.ndarray]:
+        "count consecutive preprocessed frames from the middle of the frame range"
+        prep = self.preprocess()
+        frames = []
+        for _, frame in self.decode(max(len(self.labels()) - count, 0) // 2):
+            frames.append(prep.frame(frame))
+            if len(frames) == count: break
+            
+        return frames
+        
+    def to_labels(self, file):
+        "position.json and click.json only, computed from the beatmap without opening the video, so fps or source_fps must be given"
+        if 'fps' not in vars(self) and 'source_fps' not in vars(self):
+            raise ValueError('labels without the video need fps or source_fps, the video rate is not read')
+        
+        # positions and clicks do not depend on the source rate, only the unused frame column does
+        first, last = self.frame_range()
+        table = LabelTable.build(self.file.timeline, self.delay, self.n)[first:last]
+        with zipfile.ZipFile(file, 'w') as zfile:
+            self.write_labels(zfile, table=table)
 
-            zfile.writestr('position.json', json.dumps(positions))
-            zfile.writestr('click.json', json.dumps(clicks))
+    def to_shards(self, directory, shard_size=1024):
+        prep = self.preprocess()
+        positions, clicks = self.label_arrays()
+        with ShardWriter(directory, shard_size) as writer:
+            bar = tqdm.tqdm(self.decode(), total=len(clicks), disable=not self.progress)
+            for i, frame in bar:
+                with Profiler.stage('preprocess'):
+                    frame = prep.frame(frame)
+                with Profiler.stage('shard.write') as stage:
+                    writer.write_frame(frame)
+                    writer.write_labels(positions[i:i + 1], clicks[i:i + 1])
+                    stage.bytes = frame.nbytes
+                    
+                Profiler.update(bar)
 
     @classmethod
-    def from_file(cls, path):
+    def from_file(cls, path, **overrides):
         with open(f'convertors/{path}', 'r', encoding='utf-8') as cfile:
             rows = cfile.read().split('\n')
 
         params = {}
         for row in rows:
+            if not row.strip(): continue
             key, *value = row.split('=')
             value = '='.join(value)
 
             match key:
-                case 'size':
+                case 'size' | 'resize':
                     params[key] = tuple(map(int, value.split(',')))
-                case 'delay':
+                case 'delay' | 'start' | 'end' | 'crop':
                     params[key] = int(value)
+                case 'fps' | 'source_fps' | 'tolerance':
+                    params[key] = float(value)
+                case 'gray':
+                    params[key] = value.strip().lower() in ('1', 'true', 'yes')
                 case _:
                     params[key] = value
 
+        params.update((key, value) for key, value in overrides.items() if value is not None)
         return cls(**params)
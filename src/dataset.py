@@ -0,0 +1,169 @@
+from __future__ import annotations
+import os
+import re
+import json
+import zlib
+import struct
+import zipfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .encoding import PROFILES
+from .profiler import Profiler
+
+image_re = re.compile(r'images/(\d+)(\.\w+)$')
+local_header = struct.Struct('<4s22xHH')
+
+class ZipDataset:
+    "random access to a to_data zip: frame i with its labels, frames decoded in parallel and kept in a bytes-bounded LRU"
+    positions: np.ndarray
+    clicks: np.ndarray
+
+    def __init__(self, file: str, cache_bytes: int = 512 * 1024 ** 2, workers: int = None) -> None:
+        self.file = file
+        self.cache_bytes = cache_bytes
+        self.cache = OrderedDict()
+        self.cached = 0
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(workers or os.cpu_count() or 1)
+        self.zfile = zipfile.ZipFile(file)
+        self.handle = open(file, 'rb')
+        self.__index()
+
+        self.positions = np.array(json.loads(self.zfile.read('position.json')), dtype=np.int64).reshape(-1, 2)
+        self.clicks = np.array(json.loads(self.zfile.read('click.json')), dtype=np.uint8)
+
+    def __index(self):
+        "one pass over the central directory into arrays indexed by frame number"
+        entries = {}
+        for info in self.zfile.infolist():
+            if match := image_re.match(info.filename):
+                entries[int(match.group(1))] = info, match.group(2)
+
+        count = max(entries, default=-1) + 1
+        self.infos = [None] * count
+        self.header = np.full(count, -1, dtype=np.int64)
+        self.offset = np.full(count, -1, dtype=np.int64)
+        self.size = np.zeros(count, dtype=np.int64)
+        self.method = np.zeros(count, dtype=np.int32)
+        self.ext = [None] * count
+        for i, (info, ext) in entries.items():
+            self.infos[i] = info
+            self.header[i] = info.header_offset
+            self.size[i] = info.compress_size
+            self.method[i] = info.compress_type
+            self.ext[i] = ext
+
+        exts = set(filter(None, self.ext))
+        self.decoders = {}
+        for ext in exts:
+            for profile in PROFILES.values():
+                if profile.ext == ext:
+                    self.decoders[ext] = profile
+                    break
+            else:
+                raise ValueError(f'no encoding profile decodes {ext} frames')
+
+    def __len__(self):
+        return len(self.infos)
+
+    def __repr__(self):
+        return f'<ZipDataset {self.file} frames: {len(self)}, cached: {len(self.cache)} ({self.cached} bytes)>'
+
+    def __enter__(self) -> ZipDataset:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown()
+        self.handle.close()
+        self.zfile.close()
+
+    def __getitem__(self, index):
+        "(frame, position, click) for an int, (frames, positions, clicks) stacked for a slice or an index array"
+        if isinstance(index, slice):
+            index = np.arange(len(self))[index]
+
+        if np.ndim(index) == 0:
+            i = self.__check(int(index))
+            return self.frames([i])[0], self.positions[i], self.clicks[i]
+
+        index = np.asarray(index, dtype=np.int64)
+        frames = self.frames(index)
+        return (np.stack(frames) if frames else np.empty((0,), dtype=np.uint8)), self.positions[index], self.clicks[index]
+
+    def __check(self, i: int) -> int:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self) or self.infos[i] is None:
+            raise IndexError(f'frame {i} is not in {self.file}')
+        return i
+
+    def __read(self, i: int) -> bytes:
+        "raw member bytes straight from the file at the indexed offset, without zipfile's per member open"
+        with self.lock:
+            if self.offset[i] < 0:
+                self.handle.seek(self.header[i])
+                signature, name, extra = local_header.unpack(self.handle.read(local_header.size))
+                if signature != b'PK\x03\x04':
+                    raise zipfile.BadZipFile(f'bad local header for frame {i}')
+                self.offset[i] = self.header[i] + local_header.size + name + extra
+
+            self.handle.seek(self.offset[i])
+            data = self.handle.read(self.size[i])
+
+        match self.method[i]:
+            case zipfile.ZIP_STORED:
+                return data
+            case zipfile.ZIP_DEFLATED:
+                return zlib.decompress(data, -15)
+            case _:
+                return self.zfile.read(self.infos[i])
+
+    def __load(self, i: int) -> np.ndarray:
+        with Profiler.stage('dataset.read') as stage:
+            data = self.__read(i)
+            stage.bytes = len(data)
+        with Profiler.stage('dataset.decode'):
+            return self.decoders[self.ext[i]].decode(data)
+
+    def frames(self, indices) -> list[np.ndarray]:
+        "decoded frames in the order asked, each missing frame decoded once on the pool"
+        indices = [self.__check(int(i)) for i in indices]
+        found = {}
+        # the lock is only held around the LRU, never while the pool reads, which takes it per read
+        with self.lock:
+            for i in indices:
+                if (frame := self.cache.get(i)) is not None:
+                    self.cache.move_to_end(i)
+                    found[i] = frame
+
+        missing = [i for i in dict.fromkeys(indices) if i not in found]
+        for i, frame in zip(missing, self.pool.map(self.__load, missing)):
+            found[i] = frame
+
+        with self.lock:
+            for i in missing:
+                self.__store(i, found[i])
+
+        return [found[i] for i in indices]
+
+    def __store(self, i: int, frame: np.ndarray):
+        "with the lock held, a frame another thread stored meanwhile is only marked as used"
+        if i in self.cache:
+            self.cache.move_to_end(i)
+            return
+        if frame.nbytes > self.cache_bytes:
+            return
+
+        frame.flags.writeable = False
+        self.cache[i] = frame
+        self.cached += frame.nbytes
+        while self.cached > self.cache_bytes:
+            _, old = self.cache.popitem(last=False)
+            self.cached -= old.nbytes
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import cv2
+import queue
+import itertools
+import threading
+
+from .profiler import Profiler
+
+class FrameDecoder:
+    "reads the given increasing source frame indices of a cv2.VideoCapture on a background thread into a bounded prefetch queue"
+    end = object()
+    
+    def __init__(self, capture, prefetch: int = 8, frames=None) -> None:
+        self.capture = capture
+        self.frames = itertools.count() if frames is None else frames
+        self.queue = queue.Queue(max(prefetch, 1))
+        self.stopped = threading.Event()
+        self.finished = False
+        self.thread = threading.Thread(target=self.__run, name='frame-decoder', daemon=True)
+        self.thread.start()
+        
+    def __enter__(self) -> FrameDecoder:
+        return self
+    
+    def __exit__(self, *_):
+        self.close()
+        
+    def __iter__(self):
+        while (frame := self.read()) is not None:
+            yield frame
+        
+    def __put(self, item) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+            
+        return False
+        
+    def __seek(self, start: int):
+        "move to the start frame, skipping with grab() when the backend cannot seek"
+        capture = self.capture
+        if int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+            return
+        
+        if capture.set(cv2.CAP_PROP_POS_FRAMES, start) and int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+            return
+        
+        capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        for _ in range(start):
+            if self.stopped.is_set() or not capture.grab():
+                break
+        
+    def __run(self):
+        try:
+            position, frame = None, None
+            for index in map(int, self.frames):
+                if self.stopped.is_set():
+                    break
+                
+                if position is None:
+                    with Profiler.stage('seek'):
+                        self.__seek(index)
+                    position = index
+                    
+                # frames dropped between two wanted ones are only grabbed, not decoded
+                while position < index and self.capture.grab():
+                    position += 1
+                    
+                if position > index:
+                    # the same source frame again when the output rate is above the source rate
+                    frame = frame.copy()
+                else:
+                    with Profiler.stage('decode'):
+                        ok, frame = self.capture.read()
+                    if not ok:
+                        break
+                    position += 1
+                    
+                if not self.__put(frame):
+                    break
+        except BaseException as error:
+            self.__put(error)
+        finally:
+            self.__put(self.end)
+            
+    def read(self):
+        "next decoded frame, None once the stream has ended"
+        if self.finished:
+            return None
+        
+        with Profiler.stage('decode.wait'):
+            item = self.queue.get()
+        if item is self.end:
+            self.finished = True
+            return None
+        
+        if isinstance(item, BaseException):
+            self.finished = True
+            raise item
+        
+        return item
+    
+    def close(self):
+        self.stopped.set()
+        while self.thread.is_alive():
+            try:
+                self.queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            
+        self.finished = True
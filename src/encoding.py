@@ -0,0 +1,103 @@
+from __future__ import annotations
+import io
+import time
+import zipfile
+
+import cv2
+import numpy as np
+
+class EncodingProfile:
+    "how a frame is stored in the to_data zip: image format, encoder parameters and zip compression"
+    def __init__(self, name: str, ext: str, params=(), compression=zipfile.ZIP_STORED, level=None) -> None:
+        self.name = name
+        self.ext = ext
+        self.params = list(params)
+        self.compression = compression
+        self.level = level
+        
+    def __repr__(self):
+        return f'<EncodingProfile {self.name}: {self.ext} {self.params}, zip: {self.compression}>'
+    
+    def encode(self, frame: np.ndarray) -> bytes:
+        if self.ext == '.npy':
+            buffer = io.BytesIO()
+            np.save(buffer, np.ascontiguousarray(frame), allow_pickle=False)
+            return buffer.getvalue()
+        
+        ok, data = cv2.imencode(self.ext, frame, self.params)
+        if not ok:
+            raise ValueError(f'{self.name} could not encode a frame of shape {frame.shape}')
+        
+        return data.tobytes()
+    
+    def bound(self, shape: tuple[int, ...]) -> int:
+        "most bytes encode() returns for a frame of this shape"
+        height, width, channels = (*shape, 1)[:3]
+        if self.ext == '.npy':
+            return height * width * channels + 4096
+        if self.ext == '.jpg':
+            # blocks are padded to 16 pixels and a block of noise costs well under two bytes per sample
+            return 2 * (-(-height // 16) * 16) * (-(-width // 16) * 16) * channels + 65536
+        
+        # incompressible png and lossless webp fall back to stored blocks: the rows, their filter bytes and chunk framing
+        rows = height * (width * channels + 1)
+        return rows + rows // 256 + 65536
+    
+    def decode(self, data: bytes) -> np.ndarray:
+        if self.ext == '.npy':
+            return np.load(io.BytesIO(data), allow_pickle=False)
+        
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    
+    def writestr(self, zfile: zipfile.ZipFile, index: int, data: bytes):
+        zfile.writestr(f'images/{index}{self.ext}', data, compress_type=self.compression, compresslevel=self.level)
+
+PROFILES = {profile.name: profile for profile in (
+    EncodingProfile('png', '.png'),
+    EncodingProfile('png-fast', '.png', (cv2.IMWRITE_PNG_COMPRESSION, 1)),
+    EncodingProfile('png-small', '.png', (cv2.IMWRITE_PNG_COMPRESSION, 9)),
+    EncodingProfile('webp-lossless', '.webp', (cv2.IMWRITE_WEBP_QUALITY, 101)),
+    EncodingProfile('jpeg-95', '.jpg', (cv2.IMWRITE_JPEG_QUALITY, 95)),
+    EncodingProfile('jpeg-80', '.jpg', (cv2.IMWRITE_JPEG_QUALITY, 80)),
+    EncodingProfile('raw', '.npy'),
+    EncodingProfile('raw-deflate', '.npy', compression=zipfile.ZIP_DEFLATED, level=1),
+)}
+
+def get_profile(profile: str | EncodingProfile) -> EncodingProfile:
+    if isinstance(profile, EncodingProfile):
+        return profile
+    
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f'unknown encoding profile {profile}, expected one of {", ".join(PROFILES)}') from None
+
+def benchmark(frames: list[np.ndarray], profiles=None) -> list[dict]:
+    "frames/s, bytes/frame (after zip compression) and decode frames/s of each profile"
+    results = []
+    for profile in map(get_profile, profiles or PROFILES):
+        begin = time.perf_counter()
+        encoded = [profile.encode(frame) for frame in frames]
+        encode_time = time.perf_counter() - begin
+        
+        buffer = io.BytesIO()
+        begin = time.perf_counter()
+        with zipfile.ZipFile(buffer, 'w') as zfile:
+            for i, data in enumerate(encoded):
+                profile.writestr(zfile, i, data)
+        write_time = time.perf_counter() - begin
+                
+        begin = time.perf_counter()
+        with zipfile.ZipFile(buffer) as zfile:
+            decoded = [profile.decode(zfile.read(f'images/{i}{profile.ext}')) for i in range(len(encoded))]
+        decode_time = time.perf_counter() - begin
+        
+        results.append({
+            'profile': profile.name,
+            'frames': len(frames),
+            'encode_fps': len(frames) / (encode_time + write_time),
+            'bytes_per_frame': buffer.getbuffer().nbytes / len(frames),
+            'decode_fps': len(frames) / decode_time,
+            'lossless': all(np.array_equal(frame, image) for frame, image in zip(frames, decoded))})
+        
+    return results
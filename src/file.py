@@ -1,10 +1,15 @@
-from functools import partial, reduce
-from pprint import pprint
+from __future__ import annotations
+from functools import cached_property
 import re
 
-from .time import TimePoint
+import numpy as np
+
+from .time import TimePoint, TimingIndex
 from .object import Circle, Slide, Spin, HitObject
+from .timeline import Timeline
+from .cache import BeatmapCache
 from .difficulty import Difficulty
+from .profiler import Profiler, timed
 
 def reduce_map(cb, iterable, init):
     for item in iterable:
@@ -14,9 +19,32 @@ def reduce_map(cb, iterable, init):
             
         yield result
 
+slot_re = re.compile(r'\[(.*)\]')
+
+def read_sections(lines, keys) -> dict[str, list[str]]:
+    "stripped non-empty lines of the wanted [Section]s"
+    sections = {}
+    curr_slot = ""
+    need = False
+    for line in lines:
+        if ms := slot_re.match(line):
+            curr_slot = ms.group(1)
+            if curr_slot in keys:
+                sections[curr_slot] = []
+                need = True
+                continue
+            else:
+                need = False
+
+        if need and len(line.strip()):
+            sections[curr_slot].append(line.strip())
+            
+    return sections
+
 class File:
     content: str
     slots: ...
+    timeline: Timeline
     need_keys = (
         'TimingPoints',
         'HitObjects',
@@ -25,39 +53,59 @@ class File:
         'SliderMultiplier',
         'SliderTickRate')
     
-    def __init__(self, file_name: str) -> None:
-        with open(file_name, 'r', encoding='utf-8') as ofile:
+    def __init__(self, file_name: str, cache: BeatmapCache | None = None, n: float = None, tolerance: float = None) -> None:
+        self.n = Slide.n if n is None else n
+        self.tolerance = Slide.tolerance if tolerance is None else tolerance
+        if not self.tolerance > 0:
+            raise ValueError(f'bezier tolerance must be positive, got {self.tolerance}')
+        
+        with Profiler.stage('osu.read') as stage, open(file_name, 'r', encoding='utf-8') as ofile:
             self.content = ofile.readlines()
+            stage.bytes = sum(map(len, self.content))
         
-        self.__init()
+        with Profiler.stage('osu.parse'):
+            self.__init()
+            
+        timeline = None
+        if cache is not None:
+            with Profiler.stage('cache.load'):
+                key = cache.key(''.join(self.content).encode('utf-8'), self.n, self.tolerance, Spin.r, Spin.cps)
+                timeline = cache.load(key)
+            
+        if timeline is None:
+            with Profiler.stage('timeline'):
+                timeline = Timeline.from_objects(self.objects)
+            if cache is not None:
+                with Profiler.stage('cache.store'):
+                    cache.store(key, timeline)
+                
+        self.timeline = timeline
         
     def __iter__(self):
-        for object in self.objects:
-            yield from object
+        yield from self.timeline
+        
+    @cached_property
+    @timed('objects')
+    def objects(self) -> list[HitObject]:
+        rows = [line.split(',') for line in self.hit_objects]
+        sliders = [i for i, data in enumerate(rows) if int(data[3]) & 3 == 2]
+        durations = [None] * len(rows)
+        if sliders:
+            times = np.array([int(rows[i][2]) for i in sliders])
+            lengths = np.array([float(rows[i][7]) for i in sliders])
+            for i, duration in zip(sliders, self.timing.durations(times, lengths, self.difficulty.slider_mutiplier).tolist()):
+                durations[i] = duration
+                
+        return [HitObject.from_source(data, self.timing, self.difficulty, duration, self.n, self.tolerance) for data, duration in zip(rows, durations)]
             
     def __init(self):
-        need_content = {}
-        slot_re = re.compile('\[(.*)\]')
-        curr_slot = ""
-        need = False
-        for line in self.content:
-            if ms := slot_re.match(line):
-                curr_slot = ms.group(1)
-                if curr_slot in self.need_keys:
-                    need_content[curr_slot] = []
-                    need = True
-                    continue
-                else:
-                    need = False
-
-            if need and len(line.strip()):
-                need_content[curr_slot].append(line.strip())
-                
+        need_content = read_sections(self.content, self.need_keys)
         need_content['Difficulty'] = filter(lambda i: len(i) and i.split(':')[0] in self.diffculty_keys, need_content['Difficulty'])
         time_points = tuple(reduce_map(lambda p, c: TimePoint(c.split(','), p), need_content['TimingPoints'], None))
         time_points = (*self.__create_time_point(time_points[0]), *time_points[1:])
-        difficulty = Difficulty(dict(map(lambda i: i.split(':'), need_content['Difficulty'])))
-        self.objects = [HitObject.from_source(line, time_points, difficulty) for line in need_content['HitObjects']]
+        self.difficulty = Difficulty(dict(map(lambda i: i.split(':'), need_content['Difficulty'])))
+        self.timing = TimingIndex(time_points)
+        self.hit_objects = need_content['HitObjects']
         # Slide("287,287,18912,6,0,B|164:227|275:185|172:116|172:116|113:178,1,300".split(','), time_points, difficulty)
         # Slide("257,321,51020,2,0,P|297:266|266:129,2,200".split(','), time_points, difficulty)
         # print('-' * 80)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import tqdm
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from .file import read_sections
+
+header_keys = ('General', 'Metadata', 'Difficulty', 'TimingPoints', 'HitObjects')
+fields = {
+    'title': ('Metadata', 'Title', str),
+    'artist': ('Metadata', 'Artist', str),
+    'creator': ('Metadata', 'Creator', str),
+    'version': ('Metadata', 'Version', str),
+    'beatmap_id': ('Metadata', 'BeatmapID', int),
+    'set_id': ('Metadata', 'BeatmapSetID', int),
+    'mode': ('General', 'Mode', int),
+    'audio': ('General', 'AudioFilename', str),
+    'hp': ('Difficulty', 'HPDrainRate', float),
+    'cs': ('Difficulty', 'CircleSize', float),
+    'od': ('Difficulty', 'OverallDifficulty', float),
+    'ar': ('Difficulty', 'ApproachRate', float),
+    'slider_multiplier': ('Difficulty', 'SliderMultiplier', float)}
+stats = ('bpm', 'bpm_min', 'bpm_max', 'timing_points', 'circles', 'sliders', 'spinners', 'start', 'end')
+columns = ('path', 'mtime', 'size', 'hash', *fields, *stats)
+schema = '''
+create table if not exists beatmaps (
+    path text primary key, mtime real, size integer, hash text,
+    title text, artist text, creator text, version text, beatmap_id integer, set_id integer,
+    mode integer, audio text, hp real, cs real, od real, ar real, slider_multiplier real,
+    bpm real, bpm_min real, bpm_max real, timing_points integer,
+    circles integer, sliders integer, spinners integer, start integer, end integer)
+'''
+
+def pairs(lines: list[str]) -> dict[str, str]:
+    return dict(map(str.strip, line.split(':', 1)) for line in lines if ':' in line)
+
+def parse_header(path: str) -> dict:
+    "metadata, difficulty, bpm and hit object counts of a .osu without computing any slider"
+    with open(path, 'rb') as ofile:
+        raw = ofile.read()
+
+    sections = read_sections(raw.decode('utf-8', 'replace').splitlines(), header_keys)
+    values = {key: pairs(sections.get(key, [])) for key in ('General', 'Metadata', 'Difficulty')}
+    row = {'hash': hashlib.sha1(raw).hexdigest()}
+    for name, (section, key, cast) in fields.items():
+        try:
+            row[name] = cast(values[section][key])
+        except (KeyError, ValueError):
+            row[name] = None
+
+    beats = []
+    timing = sections.get('TimingPoints', [])
+    for line in timing:
+        data = line.split(',')
+        try:
+            step = float(data[1])
+            if step > 0 and (len(data) < 7 or data[6].strip() != '0'):
+                beats.append((int(float(data[0])), 60000 / step))
+        except (IndexError, ValueError):
+            continue
+
+    counts = {1: 0, 2: 0, 8: 0}
+    times = []
+    for line in sections.get('HitObjects', []):
+        data = line.split(',', 4)
+        try:
+            ty = int(data[3])
+            times.append(int(data[2]))
+        except (IndexError, ValueError):
+            continue
+
+        for bit in counts:
+            if ty & bit:
+                counts[bit] += 1
+                break
+
+    bpms = [bpm for _, bpm in beats]
+    row.update(
+        bpm=main_bpm(beats, times[-1] if times else 0),
+        bpm_min=min(bpms, default=None),
+        bpm_max=max(bpms, default=None),
+        timing_points=len(timing),
+        circles=counts[1],
+        sliders=counts[2],
+        spinners=counts[8],
+        start=min(times, default=None),
+        end=max(times, default=None))
+    return row
+
+def main_bpm(beats: list[tuple[int, float]], end: int) -> float | None:
+    "the bpm that lasts the longest until the last hit object"
+    if not beats:
+        return None
+
+    durations = {}
+    ends = [start for start, _ in beats[1:]] + [max(end, beats[-1][0])]
+    for (start, bpm), next_start in zip(beats, ends):
+        durations[bpm] = durations.get(bpm, 0) + max(next_start - start, 0)
+
+    return max(durations, key=durations.get, default=None)
+
+def index_file(item: tuple[str, float, int]) -> dict | None:
+    path, mtime, size = item
+    try:
+        row = parse_header(path)
+    except OSError:
+        return None
+
+    row.update(path=path, mtime=mtime, size=size)
+    return row
+
+def connect(db: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(db)
+    connection.row_factory = sqlite3.Row
+    connection.execute(schema)
+    return connection
+
+def scan(songs: str):
+    for root, _, names in os.walk(songs):
+        for name in names:
+            if name.endswith('.osu'):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                yield path, stat.st_mtime, stat.st_size
+
+def build_index(songs: str, db: str = 'songs.db', processes=None, progress=True) -> dict[str, int]:
+    "index every .osu under songs, reparsing only files whose mtime or size changed"
+    with connect(db) as connection:
+        known = {row['path']: (row['mtime'], row['size']) for row in connection.execute('select path, mtime, size from beatmaps')}
+        found = list(scan(songs))
+        changed = [item for item in found if known.get(item[0]) != item[1:]]
+        removed = known.keys() - {path for path, _, _ in found}
+        connection.executemany('delete from beatmaps where path = ?', ((path,) for path in removed))
+
+        insert = 'insert or replace into beatmaps ({}) values ({})'.format(', '.join(columns), ', '.join('?' * len(columns)))
+        indexed = 0
+        with ProcessPoolExecutor(processes) as pool:
+            results = pool.map(index_file, changed, chunksize=64)
+            for row in tqdm.tqdm(results, total=len(changed), disable=not progress):
+                if row is not None:
+                    connection.execute(insert, tuple(row[column] for column in columns))
+                    indexed += 1
+
+    return {'found': len(found), 'indexed': indexed, 'unchanged': len(found) - len(changed), 'removed': len(removed)}
+
+def query(db: str, limit=None, **ranges) -> list[sqlite3.Row]:
+    "rows whose columns fall in the given ranges, e.g. query(db, sliders=(100, None), bpm=(160, 200), mode=(0, 0))"
+    conditions, params = [], []
+    for column, (low, high) in ranges.items():
+        if column not in columns:
+            raise ValueError(f'unknown column {column}')
+
+        if low is not None:
+            conditions.append(f'{column} >= ?')
+            params.append(low)
+        if high is not None:
+            conditions.append(f'{column} <= ?')
+            params.append(high)
+
+    sql = 'select * from beatmaps'
+    if conditions:
+        sql += ' where ' + ' and '.join(conditions)
+    if limit is not None:
+        sql += ' limit ?'
+        params.append(limit)
+
+    with connect(db) as connection:
+        return connection.execute(sql, params).fetchall()
+
+def bounds(value: str) -> tuple[float | None, float | None]:
+    if ',' not in value:
+        return float(value), float(value)
+
+    low, high = value.split(',', 1)
+    return (float(low) if low else None), (float(high) if high else None)
+
+parser = argparse.ArgumentParser(
+    prog='Osu Index',
+    description='index an osu! Songs folder into sqlite and query it')
+
+parser.add_argument('db', metavar='database')
+parser.add_argument('-i', '--index', metavar='songs', help='scan this Songs folder before querying')
+parser.add_argument('--processes', type=int, metavar='count')
+parser.add_argument('-r', '--range', nargs=2, action='append', default=[], metavar=('column', 'low,high'),
+                    help='filter on a column, either bound may be empty, a single value means equal')
+parser.add_argument('-n', '--limit', type=int)
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    if args.index is not None:
+        begin = time.perf_counter()
+        result = build_index(args.index, args.db, args.processes)
+        print('{found} found, {indexed} indexed, {unchanged} unchanged, {removed} removed'.format(**result), f'in {time.perf_counter() - begin:.1f}s', file=sys.stderr)
+
+    ranges = {column: bounds(value) for column, value in args.range}
+    if ranges or args.index is None:
+        for row in query(args.db, args.limit, **ranges):
+            print(row['path'], f"bpm={row['bpm']}", f"sliders={row['sliders']}", f"circles={row['circles']}", sep='\t')
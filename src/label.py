@@ -0,0 +1,95 @@
+from __future__ import annotations
+from math import ceil
+
+import numpy as np
+
+from .pixel import Pixel
+from .timeline import Timeline
+from .profiler import timed
+
+class LabelTable:
+    "per-frame labels: source video frame index, osu! position (interpolated over gaps) and click flag"
+    frame: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    click: np.ndarray
+    origin: Pixel = Pixel(256, 192)
+
+    def __init__(self, frame, x, y, click) -> None:
+        self.frame = np.asarray(frame, dtype=np.int64)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.click = np.asarray(click, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __repr__(self):
+        return f'<LabelTable frames: {len(self)}, clicks: {int(self.click.sum())}>'
+
+    def __getitem__(self, index: slice) -> LabelTable:
+        return LabelTable(self.frame[index], self.x[index], self.y[index], self.click[index])
+
+    @property
+    def positions(self) -> np.ndarray:
+        return np.column_stack((self.x, self.y))
+
+    def pixel(self, i: int) -> Pixel | None:
+        "the raw hit object position of a clicked frame, as the old frame iterator yielded it"
+        if not self.click[i]:
+            return None
+        return Pixel(int(self.x[i]), int(self.y[i]))
+
+    @classmethod
+    @timed('labels')
+    def build(cls, timeline: Timeline, delay: float, n: float, ratio: float = 1.) -> LabelTable:
+        "align every output frame from 0 to the last sample with the timeline, output frame k shows source frame round(k * ratio)"
+        start = -delay
+        times = timeline.time.astype(np.int64)
+        if not len(times):
+            return cls(*([],) * 4)
+
+        # a frame belongs to the first sample that lies after it; samples going back in time never claim frames
+        reach = np.maximum.accumulate(times)
+        count = max(ceil((reach[-1] - start) / n), 0)
+        while count > 0 and not start + n * (count - 1) < reach[-1]:
+            count -= 1
+        while start + n * count < reach[-1]:
+            count += 1
+
+        frame = np.arange(count)
+        sample = np.searchsorted(reach, start + n * frame, side='right')
+        time = times[sample]
+        prev_time = np.where(sample > 0, times[sample - 1], 0)
+        click = ((time - prev_time) / n < 1.3) | ((start + n * (frame + 1) - time) / n > -0.3)
+        x = timeline.x[sample].astype(np.float64)
+        y = timeline.y[sample].astype(np.float64)
+        cls.fill_gaps(x, y, click)
+        return cls(np.floor(frame * ratio + 0.5) if ratio != 1 else frame, x, y, click)
+
+    @classmethod
+    def fill_gaps(cls, x: np.ndarray, y: np.ndarray, click: np.ndarray):
+        "interpolate unclicked runs towards the next click like the old Labeler, holding the last position at the end"
+        clicked = np.flatnonzero(click)
+        gap = np.flatnonzero(click == 0)
+        if not len(clicked):
+            x[:], y[:] = cls.origin
+            return
+
+        ahead = np.searchsorted(clicked, gap)
+        trailing = ahead == len(clicked)
+        prev_frame = np.where(ahead > 0, clicked[np.maximum(ahead - 1, 0)], -1)
+        next_frame = clicked[np.minimum(ahead, len(clicked) - 1)]
+        prev_x = np.where(ahead > 0, x[prev_frame], cls.origin.x)
+        prev_y = np.where(ahead > 0, y[prev_frame], cls.origin.y)
+        next_x = np.where(trailing, prev_x, x[next_frame])
+        next_y = np.where(trailing, prev_y, y[next_frame])
+
+        # the same steps as np.linspace(1 / length, 1, length) over each gap
+        length = np.where(trailing, 1, next_frame - prev_frame - 1)
+        k = np.where(trailing, 0, gap - prev_frame - 1)
+        first = 1 / length
+        step = np.divide(1 - first, length - 1, out=np.zeros(len(gap)), where=length > 1)
+        s = np.where(k == length - 1, 1., k * step + first)
+        x[gap] = np.rint(prev_x + (next_x - prev_x) * s)
+        y[gap] = np.rint(prev_y + (next_y - prev_y) * s)
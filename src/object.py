@@ -1,11 +1,9 @@
 from __future__ import annotations
 from enum import IntEnum
-from math import ceil, pi, cos, sin
-from functools import partial
 from .pixel import Pixel
 from .difficulty import Difficulty
-from .time import TimePoint
-from .utils import until, split_same, b_curve, p_curve, l_curve, calculate_length, calculate_points, draw_points, window, split_time, estimate_length
+from .time import TimingIndex
+from .path import BEZIER_TOLERANCE, bounce, sample_count, sample_times, linear_path, perfect_path, bezier_path, spin_path
 
 import numpy as np
 
@@ -16,129 +14,98 @@ class ObjectType(IntEnum):
 
 class HitObject:
     ty: ObjectType
-    times: list[int]
-    points: list[Pixel]
+    times: np.ndarray
+    points: np.ndarray
     
     def __init__(self, type: ObjectType):
         self.ty = type
         
     def __repr__(self):
-        return f'<{self.__class__.__name__} point="{self.points[0]} to {self.points[-1]}">'
+        return f'<{self.__class__.__name__} point="{Pixel(*self.points[0])} to {Pixel(*self.points[-1])}">'
     
     def __iter__(self):
-        # print(self.points)
-        yield from zip(self.points, self.times)
+        for (x, y), time in zip(self.points.tolist(), self.times.tolist()):
+            yield Pixel(x, y), time
         
     @staticmethod
-    def from_source(raw: str, time_points: list[TimePoint], difficulty: Difficulty) -> "HitObject":
-        data = raw.split(',')
+    def from_source(raw: str | list[str], timing: TimingIndex, difficulty: Difficulty, duration: float = None, n: float = None,
+                    tolerance: float = None) -> "HitObject":
+        data = raw.split(',') if isinstance(raw, str) else raw
         ty = int(data[3])
         if ty & 1:
             return Circle(data)
         elif ty & 2:
-            return Slide(data, time_points, difficulty)
+            return Slide(data, timing, difficulty, duration, n, tolerance)
         elif ty & 8:
-            return Spin(data)
+            return Spin(data, n)
         
 class Circle(HitObject):
     def __init__(self, data: list[str]):
         super().__init__(ObjectType.Circle)
-        self.times = [int(data[2])]
-        self.points = [Pixel(int(data[0]), int(data[1]))]
+        self.times = np.array([int(data[2])])
+        self.points = np.array([[int(data[0]), int(data[1])]])
         
 class Slide(HitObject):
     n: float = 1 / 60 * 1000
+    tolerance: float = BEZIER_TOLERANCE
     "x, y, start_time, xxx, xxx, line_points, times, length"
     "0, 1, 2         , 3  , 4  , 5          , 6    , 7     "
-    def __init__(self, data: list[str], time_points: list[TimePoint], difficulty: Difficulty):
+    def __init__(self, data: list[str], timing: TimingIndex, difficulty: Difficulty, duration: float = None, n: float = None,
+                 tolerance: float = None):
         super().__init__(ObjectType.Slide)
-        current: TimePoint = list(until(lambda i: i, time_points, lambda i: i.start <= int(data[2])))[-1]
+        if n is not None:
+            self.n = n
+        if tolerance is not None:
+            self.tolerance = tolerance
         points_data = data[5].split('|')
         flag = points_data[0]
         points = [Pixel(int(data[0]), int(data[1]))] + list(map(lambda i: Pixel(*map(int, i.split(':'))), points_data[1:]))
-        time = float(data[7]) / (100 * difficulty.slider_mutiplier * current.multiple) * current.base_step
+        time = duration
+        if time is None:
+            time = float(timing.durations(int(data[2]), float(data[7]), difficulty.slider_mutiplier))
         start_time = int(data[2])
         self.length = float(data[7])
         
         match flag:
             case 'B':
-                self.init_B(points, start_time, time)
+                path = self.init_B(points, time)
             case 'P':
-                self.init_P(points, start_time, time)
+                path = self.init_P(points, time)
             case 'L':
-                self.init_L(points, start_time, time)
+                path = self.init_L(points, time)
         
-        temp_points = self.points.copy()
-        temp_times = np.array(self.times, dtype=np.float64)
-        reverse = True
-        for _ in range(int(data[6]) - 1):
-            if reverse:
-                self.points.extend(list(reversed(temp_points))[1:])
-            else:
-                self.points.extend(temp_points[1:])
-                
-            temp_times += time
-            self.times.extend(temp_times[1:])
-            
-            reverse = not reverse
-            
-        self.times = list(map(round, self.times))
+        repeats = int(data[6])
+        self.points = np.rint(path).astype(np.int32)[bounce(len(path), repeats)]
+        self.times = np.rint(sample_times(start_time, time * repeats, len(self.points))).astype(np.int32)
         
-    def init_B(self, points: list[Pixel], current: int, time_length: float):
-        chunks = tuple(split_same(points))
-        times = split_time(chunks, time_length)
-        steps = [time / self.n for time in times] # need change
-        wrappers = list(map(lambda params: b_curve(*params), zip(chunks, times)))
-        full_points = list(point.round() for point in calculate_points(wrappers, steps))
-        full_points_length = len(full_points)
-        full_times = list(current + time_length * (i / full_points_length) for i in range(full_points_length + 1))
+    def init_B(self, points: list[Pixel], time_length: float) -> np.ndarray:
+        return bezier_path(points, sample_count(time_length, self.n), self.tolerance)
         
-        self.points = full_points
-        self.times = full_times
-        
-    def init_P(self, points: tuple[Pixel, Pixel, Pixel], current: int, time_length: float):
+    def init_P(self, points: tuple[Pixel, Pixel, Pixel], time_length: float) -> np.ndarray:
         if points[0] == points[2]:
-            return self.init_L(points, current, time_length)
+            return self.init_L(points, time_length)
         elif points[0] == points[1]:
-            return self.init_L(points[1:], current, time_length)
+            return self.init_L(points[1:], time_length)
         elif points[1] == points[2]:
-            return self.init_L(points[:-1], current, time_length)
-        
-        wrappers = [p_curve(points)]
-        steps = (time_length / self.n,)
-        full_points = list(point.round() for point in calculate_points(wrappers, steps))
-        full_points_length = len(full_points)
-        full_times = list(current + time_length * (i / full_points_length) for i in range(full_points_length + 1))
-        
-        self.points = full_points
-        self.times = full_times
+            return self.init_L(points[:-1], time_length)
         
-    def init_L(self, points: list[Pixel], current: int, time_length: float):
-        chunks = [win for win in window(points, 2)]
-        wrappers = list(map(l_curve, chunks))
-        lengths = calculate_length(wrappers)
-        full_length = sum(lengths)
-        steps = tuple(length / full_length * time_length / self.n for length in lengths)
-        full_points = list(point.round() for point in calculate_points(wrappers, steps))
-        full_points_length = len(full_points)
-        full_times = list(current + time_length * (i / full_points_length) for i in range(full_points_length + 1))
+        return perfect_path(points, sample_count(time_length, self.n))
         
-        self.points = full_points
-        self.times = full_times
+    def init_L(self, points: list[Pixel], time_length: float) -> np.ndarray:
+        return linear_path(points, sample_count(time_length, self.n))
         
 class Spin(HitObject):
     r: int = 44
     centor: Pixel = Pixel(256, 192)
     n: float = 1 / 60 * 1000
     cps: float = 477.26 / 120
-    def __init__(self, data: list[str]):
+    def __init__(self, data: list[str], n: float = None):
         super().__init__(ObjectType.Spin)
+        if n is not None:
+            self.n = n
         
         start = int(data[2])
         end = int(data[5])
-        time = end - start
-        
-        trange = self.cps * time / 1000 * 2 * pi
-        step = ceil(time / self.n)
-        self.points = [Pixel(round(self.centor.x + self.r * cos(t)), round(self.centor.y + self.r * sin(t))) for t in reversed(np.linspace(0, trange, step))]
-        self.times = [ceil(t) for t in np.linspace(start, end, step)]
\ No newline at end of file
+        points, times = spin_path(start, end, self.centor, self.r, self.cps, self.n)
+        self.points = np.rint(points).astype(np.int32)
+        self.times = times.astype(np.int32)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from math import ceil
+from .utils import AngelSequence, split_same
+from .profiler import timed
+
+import numpy as np
+
+BEZIER_TOLERANCE = 0.25
+
+def as_array(points) -> np.ndarray:
+    return np.array([tuple(point) for point in points], dtype=np.float64).reshape(-1, 2)
+
+def sample_count(duration: float, n: float) -> int:
+    return max(ceil(duration / n), 1) + 1
+
+def sample_times(start: float, duration: float, count: int) -> np.ndarray:
+    return start + duration * np.linspace(0, 1, count)
+
+def bounce(count: int, repeats: int) -> np.ndarray:
+    "indices walking a path of count samples back and forth repeats times"
+    if count < 2:
+        return np.zeros(1, dtype=np.intp)
+
+    span = count - 1
+    k = np.arange(repeats * span + 1)
+    return span - np.abs(k % (2 * span) - span)
+
+def arc_lengths(polyline: np.ndarray) -> np.ndarray:
+    lengths = np.zeros(len(polyline))
+    np.cumsum(np.hypot(*np.diff(polyline, axis=0).T), out=lengths[1:])
+    return lengths
+
+def resample(polyline: np.ndarray, count: int, lengths: np.ndarray = None) -> np.ndarray:
+    if lengths is None:
+        lengths = arc_lengths(polyline)
+
+    if lengths[-1] == 0:
+        return np.repeat(polyline[:1], count, axis=0)
+
+    even = np.linspace(0, lengths[-1], count)
+    return np.column_stack((np.interp(even, lengths, polyline[:, 0]), np.interp(even, lengths, polyline[:, 1])))
+
+@timed('path.linear')
+def linear_path(points, count: int) -> np.ndarray:
+    return resample(as_array(points), count)
+
+@timed('path.perfect')
+def perfect_path(points, count: int) -> np.ndarray:
+    (x1, y1), (x2, y2), (x3, y3) = as_array(points)
+    a = x1 - x2
+    b = y1 - y2
+    c = x1 - x3
+    d = y1 - y3
+    det = b * c - a * d
+    if det == 0:
+        return linear_path(points, count)
+
+    e = ((x1 ** 2 - x2 ** 2) - (y2 ** 2 - y1 ** 2)) / 2
+    f = ((x1 ** 2 - x3 ** 2) - (y3 ** 2 - y1 ** 2)) / 2
+    x = -((d * e - b * f) / det)
+    y = -((a * f - c * e) / det)
+    r = np.hypot(x1 - x, y1 - y)
+
+    angles = np.arctan2((y1 - y, y2 - y, y3 - y), (x1 - x, x2 - x, x3 - x)) % (2 * np.pi)
+    seq = AngelSequence(angles)
+    t = np.linspace(seq.head, seq.tail, count)
+    return np.column_stack((x + r * np.cos(t), y + r * np.sin(t)))
+
+def subdivide(control: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    "de Casteljau split of a batch of (K, m, 2) control polygons at t = 0.5"
+    m = control.shape[1]
+    left, right = np.empty_like(control), np.empty_like(control)
+    mid = control.copy()
+    for i in range(m):
+        left[:, i] = mid[:, 0]
+        right[:, m - i - 1] = mid[:, m - i - 1]
+        mid[:, :m - i - 1] = (mid[:, :m - i - 1] + mid[:, 1:m - i]) / 2
+
+    return left, right
+
+def is_flat(control: np.ndarray, tolerance: float) -> np.ndarray:
+    d = control[:, :-2] - 2 * control[:, 1:-1] + control[:, 2:]
+    return ((d ** 2).sum(axis=2) <= tolerance ** 2 * 4).all(axis=1)
+
+def flatten_bezier(points, tolerance: float = BEZIER_TOLERANCE) -> tuple[np.ndarray, np.ndarray]:
+    "adaptive subdivision as done by osu!, returns the polyline and its cumulative arc length"
+    if not tolerance > 0:
+        raise ValueError(f'bezier tolerance must be positive, got {tolerance}')
+
+    control = as_array(points)
+    pieces = control[None]
+    done = np.zeros(1, dtype=bool)
+    while not done.all():
+        done |= is_flat(pieces, tolerance)
+        left, right = subdivide(pieces[~done])
+        counts = np.where(done, 1, 2)
+        ends = np.cumsum(counts)
+        split = ends[~done]
+        result = np.empty((ends[-1], *pieces.shape[1:]))
+        result[ends[done] - 1] = pieces[done]
+        result[split - 2], result[split - 1] = left, right
+        pieces, done = result, np.repeat(done, counts)
+
+    m = pieces.shape[1]
+    left, right = subdivide(pieces)
+    merged = np.concatenate((left, right[:, 1:]), axis=1)
+    index = 2 * np.arange(1, m - 1)
+    inner = 0.25 * (merged[:, index - 1] + 2 * merged[:, index] + merged[:, index + 1])
+    polyline = np.concatenate((pieces[:, :1], inner), axis=1).reshape(-1, 2)
+    polyline = np.concatenate((polyline, control[-1:]))
+    return polyline, arc_lengths(polyline)
+
+@timed('path.bezier')
+def bezier_path(points, count: int, tolerance: float = BEZIER_TOLERANCE) -> np.ndarray:
+    segments = [flatten_bezier(chunk, tolerance)[0] for chunk in split_same(points)]
+    polyline = np.concatenate([segments[0]] + [segment[1:] for segment in segments[1:]])
+    return resample(polyline, count)
+
+@timed('path.spin')
+def spin_path(start: int, end: int, center, radius: float, cps: float, n: float) -> tuple[np.ndarray, np.ndarray]:
+    time = end - start
+    trange = cps * time / 1000 * 2 * np.pi
+    step = ceil(time / n)
+    t = np.linspace(trange, 0, step)
+    x, y = center
+    points = np.column_stack((x + radius * np.cos(t), y + radius * np.sin(t)))
+    return points, np.ceil(np.linspace(start, end, step))
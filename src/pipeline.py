@@ -0,0 +1,163 @@
+from __future__ import annotations
+import queue
+import zipfile
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+
+import cv2
+import tqdm
+import numpy as np
+
+from .decoder import FrameDecoder
+from .checkpoint import Checkpoint
+from .encoding import EncodingProfile
+from .preprocess import Preprocess
+
+# a slot is owned by exactly one process at a time: free -> decoder -> encoder -> writer -> free,
+# so the decoder can never run more than the ring ahead of the oldest frame not yet in the zip
+
+def ring_view(shm: shared_memory.SharedMemory, slots: int, width: int) -> np.ndarray:
+    return np.ndarray((slots, width), dtype=np.uint8, buffer=shm.buf)
+
+def decode_frames(osr, frames, shape, name, slots, width, free, filled, encoders, status, prefetch, skip):
+    # spawned children share the parent's resource tracker, which unlinks the ring only once the parent does
+    shm = shared_memory.SharedMemory(name)
+    ring = ring_view(shm, slots, width)
+    nbytes = int(np.prod(shape))
+    capture = cv2.VideoCapture(osr)
+    try:
+        with FrameDecoder(capture, prefetch, frames) as decoder:
+            for i, frame in enumerate(decoder, skip):
+                if frame.shape != shape:
+                    raise ValueError(f'video frames are {frame.shape}, the convertor size expects {shape}')
+
+                slot = free.get()
+                if slot is None:
+                    break
+
+                np.copyto(ring[slot, :nbytes].reshape(shape), frame)
+                filled.put((i, slot))
+    except BaseException:
+        status.put(('error', traceback.format_exc()))
+    finally:
+        for _ in range(encoders):
+            filled.put(None)
+
+        capture.release()
+        del ring
+        shm.close()
+
+def encode_frames(shape, name, slots, width, filled, done, status, prep: Preprocess, profile: EncodingProfile):
+    shm = shared_memory.SharedMemory(name)
+    ring = ring_view(shm, slots, width)
+    nbytes = int(np.prod(shape))
+    try:
+        while (item := filled.get()) is not None:
+            i, slot = item
+            data = profile.encode(prep.frame(ring[slot, :nbytes].reshape(shape)))
+            # the encoded frame goes back into its own slot, which is sized for the largest encoding of the frame
+            if len(data) > width:
+                raise ValueError(f'frame {i} encoded to {len(data)} bytes, more than the {width} byte slot')
+            
+            ring[slot, :len(data)] = np.frombuffer(data, dtype=np.uint8)
+            done.put((i, slot, len(data)))
+    except BaseException:
+        status.put(('error', traceback.format_exc()))
+    finally:
+        done.put(None)
+        del ring
+        shm.close()
+
+def write_frames(file, mode, skip, saves: Checkpoint, checkpoint, name, slots, width, free, done, encoders, status, profile: EncodingProfile):
+    shm = shared_memory.SharedMemory(name)
+    ring = ring_view(shm, slots, width)
+    try:
+        zfile = zipfile.ZipFile(file, mode)
+        pending = {}
+        count = skip
+        finished = 0
+        try:
+            while finished < encoders:
+                item = done.get()
+                if item is None:
+                    finished += 1
+                    continue
+
+                i, slot, length = item
+                pending[i] = slot, length
+                start = count
+                while count in pending:
+                    slot, length = pending.pop(count)
+                    profile.writestr(zfile, count, ring[slot, :length].data)
+                    free.put(slot)
+                    count += 1
+                    if saves is not None and count % checkpoint == 0:
+                        zfile = saves.save(zfile, count)
+
+                if count > start:
+                    status.put(('progress', count))
+        finally:
+            zfile.close()
+
+        status.put(('done', count))
+    except BaseException:
+        status.put(('error', traceback.format_exc()))
+    finally:
+        free.put(None)
+        del ring
+        shm.close()
+
+def run_pipeline(osr, frames: np.ndarray, size: tuple[int, int], prep: Preprocess, profile: EncodingProfile, file,
+                 encoders: int, mode='w', skip=0, saves: Checkpoint = None, checkpoint=None, slots=None, prefetch=8, progress=True) -> int:
+    "decode frames into a shared memory ring, encode them in encoder processes and write them in order, returns the frame count"
+    shape = (size[1], size[0], 3)
+    slots = slots or 4 * encoders
+    # a slot holds the decoded frame first and its encoding after, so it fits the larger of the two
+    width = max(int(np.prod(shape)), profile.bound(prep.frame(np.zeros(shape, dtype=np.uint8)).shape))
+    context = multiprocessing.get_context('spawn')
+    shm = shared_memory.SharedMemory(create=True, size=slots * width)
+    free, filled, done, status = (context.Queue() for _ in range(4))
+    for slot in range(slots):
+        free.put(slot)
+
+    processes = [
+        context.Process(target=decode_frames, name='pipeline-decoder',
+                        args=(osr, frames, shape, shm.name, slots, width, free, filled, encoders, status, prefetch, skip)),
+        *(context.Process(target=encode_frames, name=f'pipeline-encoder-{k}',
+                          args=(shape, shm.name, slots, width, filled, done, status, prep, profile)) for k in range(encoders)),
+        context.Process(target=write_frames, name='pipeline-writer',
+                        args=(file, mode, skip, saves, checkpoint, shm.name, slots, width, free, done, encoders, status, profile))]
+    for process in processes:
+        process.start()
+
+    count = None
+    try:
+        with tqdm.tqdm(total=skip + len(frames), initial=skip, disable=not progress) as bar:
+            while count is None:
+                try:
+                    kind, value = status.get(timeout=0.5)
+                except queue.Empty:
+                    if dead := [process.name for process in processes if process.exitcode not in (None, 0)]:
+                        raise RuntimeError(f'{", ".join(dead)} exited unexpectedly')
+                    continue
+
+                match kind:
+                    case 'progress':
+                        bar.update(value - bar.n)
+                    case 'done':
+                        count = value
+                    case 'error':
+                        raise RuntimeError(f'pipeline process failed:\n{value}')
+    finally:
+        if count is None:
+            for process in processes:
+                process.terminate()
+
+        for process in processes:
+            process.join()
+
+        shm.close()
+        shm.unlink()
+
+    return count
@@ -1,43 +1,136 @@
-from math import sqrt
+from __future__ import annotations
+from numbers import Real
+
+import numpy as np
 
 class Pixel:
+    __slots__ = ('x', 'y')
     x: int
     y: int
-    
+
     def __init__(self, x, y) -> None:
         self.x, self.y = x, y
-        
+
     def __eq__(self, value: object) -> bool:
-        return repr(self) == repr(value)
-    
-    def __mul__(self, value) -> "Pixel":
+        if not isinstance(value, Pixel):
+            return NotImplemented
+        return self.x == value.x and self.y == value.y
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+    def __mul__(self, value) -> Pixel | PixelArray:
+        if isinstance(value, np.ndarray):
+            return PixelArray(np.multiply.outer(value, (self.x, self.y)))
         return Pixel(self.x * value, self.y * value)
-    
-    def __rmul__(self, value) -> "Pixel":
+
+    def __rmul__(self, value) -> Pixel | PixelArray:
         return self * value
-    
-    def __div__(self, value) -> "Pixel":
+
+    def __truediv__(self, value) -> Pixel:
         return Pixel(self.x / value, self.y / value)
-    
-    def __add__(self, value) -> "Pixel":
-        if isinstance(value, int):
+
+    def __add__(self, value) -> Pixel:
+        if isinstance(value, Real):
             return Pixel(self.x + value, self.y + value)
-        return Pixel(self.x + value.x, self.y + value.y)
-    
-    def __sub__(self, value) -> "Pixel":
-        if isinstance(value, int):
+        if isinstance(value, Pixel):
+            return Pixel(self.x + value.x, self.y + value.y)
+        return NotImplemented
+
+    def __sub__(self, value) -> Pixel:
+        if isinstance(value, Real):
             return Pixel(self.x - value, self.y - value)
-        return Pixel(self.x - value.x, self.y - value.y)
-    
-    def __pow__(self, value) -> "Pixel":
+        if isinstance(value, Pixel):
+            return Pixel(self.x - value.x, self.y - value.y)
+        return NotImplemented
+
+    def __pow__(self, value) -> Pixel:
         return Pixel(self.x ** value, self.y ** value)
-        
+
     def __repr__(self) -> str:
         return f'({self.x}, {self.y})'
-    
+
     def __iter__(self):
         yield self.x
         yield self.y
-        
+
     def round(self):
-        return Pixel(round(self.x), round(self.y))
\ No newline at end of file
+        return Pixel(round(self.x), round(self.y))
+
+class PixelArray:
+    "a trajectory of pixels backed by one (N, 2) array"
+    __slots__ = ('data',)
+    data: np.ndarray
+
+    def __init__(self, data) -> None:
+        self.data = np.asarray(data, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def from_pixels(cls, pixels) -> PixelArray:
+        return cls([tuple(pixel) for pixel in pixels])
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index) -> Pixel | PixelArray:
+        if isinstance(index, slice):
+            return PixelArray(self.data[index])
+        return Pixel(*self.data[index].tolist())
+
+    def __iter__(self):
+        for x, y in self.data.tolist():
+            yield Pixel(x, y)
+
+    def __eq__(self, value: object) -> bool:
+        if not isinstance(value, PixelArray):
+            return NotImplemented
+        return np.array_equal(self.data, value.data)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'<PixelArray length: {len(self)}>'
+
+    @staticmethod
+    def operand(value):
+        "a scalar, an (x, y) offset applied to every row, or an (N, 2) array applied row by row"
+        if isinstance(value, PixelArray):
+            return value.data
+        if isinstance(value, Pixel):
+            return np.array((value.x, value.y), dtype=np.float64)
+        value = np.asarray(value, dtype=np.float64)
+        if value.ndim == 0 or value.shape == (2,) or (value.ndim == 2 and value.shape[1] == 2):
+            return value
+        raise ValueError(f'expected a scalar, an (x, y) pair or an (N, 2) array, got shape {value.shape}')
+
+    def __add__(self, value) -> PixelArray:
+        return PixelArray(self.data + self.operand(value))
+
+    def __radd__(self, value) -> PixelArray:
+        return self + value
+
+    def __sub__(self, value) -> PixelArray:
+        return PixelArray(self.data - self.operand(value))
+
+    def __rsub__(self, value) -> PixelArray:
+        return PixelArray(self.operand(value) - self.data)
+
+    def __mul__(self, value) -> PixelArray:
+        return PixelArray(self.data * self.operand(value))
+
+    def __rmul__(self, value) -> PixelArray:
+        return self * value
+
+    def __truediv__(self, value) -> PixelArray:
+        return PixelArray(self.data / self.operand(value))
+
+    def round(self) -> PixelArray:
+        return PixelArray(np.rint(self.data))
@@ -1,24 +1,65 @@
+from __future__ import annotations
 from math import floor
-import pyautogui
+
+import numpy as np
 
 from .pixel import Pixel
 
-size = pyautogui.size()
+def screen_size() -> tuple[int, int]:
+    import pyautogui
+    size = pyautogui.size()
+    return size.width, size.height
+
 class PixelConvertor:
-    height = size.height * 0.8
-    width = height // 0.75
-    start = (size.width - width) // 2, (size.height - height) // 2 + int(height * 0.02)
-    scale = height / 384
-    
-    @classmethod
-    def set_size(cls, size: tuple[int, int]):
-        cls.height = size[1] * 0.8
-        cls.width = cls.height // 0.75
-        cls.start = (size[0] - cls.width) // 2, (size[1] - cls.height) // 2 + int(cls.height * 0.02)
-        cls.scale = cls.height / 384
-    
+    "immutable mapping from osu! coordinates to the pixels of a size[0]xsize[1] frame"
+    __slots__ = ('size', 'height', 'width', 'start', 'scale')
+    size: tuple[int, int]
+    height: float
+    width: float
+    start: tuple[float, float]
+    scale: float
+
+    def __init__(self, size: tuple[int, int] = (1280, 720)) -> None:
+        height = size[1] * 0.8
+        width = height // 0.75
+        for name, value in (
+                ('size', tuple(size)),
+                ('height', height),
+                ('width', width),
+                ('start', ((size[0] - width) // 2, (size[1] - height) // 2 + int(height * 0.02))),
+                ('scale', height / 384)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, *_):
+        raise AttributeError('PixelConvertor is immutable, make a new one for another size')
+
+    def __repr__(self):
+        return f'<PixelConvertor size: {self.size}, start: {self.start}, scale: {self.scale}>'
+
+    def __eq__(self, value: object) -> bool:
+        if not isinstance(value, PixelConvertor):
+            return NotImplemented
+        return self.size == value.size
+
+    def __hash__(self) -> int:
+        return hash(self.size)
+
+    def __reduce__(self):
+        return PixelConvertor, (self.size,)
+
     @classmethod
-    def convert(cls, pixel):
-        return floor((pixel.x * cls.scale) + cls.start[0]), floor((pixel.y * cls.scale) + cls.start[1])
-    
-# print(PixelConvertor.convert(Pixel(261, 300)))
\ No newline at end of file
+    def from_screen(cls) -> PixelConvertor:
+        "for the size of the current screen, needs pyautogui"
+        return cls(screen_size())
+
+    def convert(self, pixel: Pixel) -> tuple[int, int]:
+        return floor((pixel.x * self.scale) + self.start[0]), floor((pixel.y * self.scale) + self.start[1])
+
+    def convert_many(self, points: np.ndarray) -> np.ndarray:
+        "convert for an (N, 2) array of osu! coordinates"
+        return np.floor(np.asarray(points, dtype=np.float64) * self.scale + self.start).astype(np.int64)
+
+    def boxes(self, points: np.ndarray, radius: float = 15) -> np.ndarray:
+        "(N, 4) x0, y0, x1, y1 pixel rectangles around (N, 2) osu! coordinates"
+        points = np.asarray(points, dtype=np.float64)
+        return np.hstack((self.convert_many(points - radius), self.convert_many(points + radius)))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from math import floor
+import cv2
+import numpy as np
+
+from .pixel_convertor import PixelConvertor
+
+class Preprocess:
+    "crops to a rectangle, converts to grayscale and resizes frames, and maps positions to match"
+    rect: tuple[int, int, int, int] | None
+    resize: tuple[int, int] | None
+    gray: bool
+    
+    def __init__(self, rect=None, resize=None, gray=False) -> None:
+        self.rect = rect
+        self.resize = resize
+        self.gray = gray
+        self.offset = (0, 0) if rect is None else rect[:2]
+        self.factor = (1., 1.)
+        if resize is not None:
+            if rect is None:
+                raise ValueError('resize needs a crop rectangle to scale positions')
+            
+            x0, y0, x1, y1 = rect
+            self.factor = resize[0] / (x1 - x0), resize[1] / (y1 - y0)
+            
+    def __repr__(self):
+        return f'<Preprocess rect: {self.rect}, resize: {self.resize}, gray: {self.gray}>'
+        
+    @classmethod
+    def playfield(cls, mapper: PixelConvertor | tuple[int, int], margin=None, resize=None, gray=False) -> Preprocess:
+        "crop around the playfield of the mapper's video size, or the whole frame when margin is None"
+        if not isinstance(mapper, PixelConvertor):
+            mapper = PixelConvertor(mapper)
+            
+        size = mapper.size
+        if margin is None:
+            rect = None if resize is None else (0, 0, *size)
+            return cls(rect, resize, gray)
+        
+        x, y = mapper.start
+        scale = mapper.scale
+        rect = (
+            max(int(x - margin), 0),
+            max(int(y - margin), 0),
+            min(int(x + 512 * scale + margin), size[0]),
+            min(int(y + 384 * scale + margin), size[1]))
+        return cls(rect, resize, gray)
+    
+    def frame(self, frame):
+        if self.rect is not None:
+            x0, y0, x1, y1 = self.rect
+            frame = frame[y0:y1, x0:x1]
+            
+        if self.gray and frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            
+        if self.resize is not None:
+            frame = cv2.resize(frame, self.resize, interpolation=cv2.INTER_AREA)
+            
+        return frame
+    
+    def position(self, position: tuple[int, int]) -> tuple[int, int]:
+        if self.rect is None:
+            return position
+        
+        (x, y), (x0, y0), (sx, sy) = position, self.offset, self.factor
+        return floor((x - x0) * sx), floor((y - y0) * sy)
+    
+    def positions(self, positions: np.ndarray) -> np.ndarray:
+        "position for an (N, 2) array"
+        if self.rect is None:
+            return positions
+        
+        return np.floor((positions - self.offset) * self.factor).astype(np.int64)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import json
+import threading
+from functools import wraps
+from time import perf_counter
+
+class Stage:
+    "times one block into Profiler, bytes can be added before it exits"
+    __slots__ = ('name', 'begin', 'bytes')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.bytes = 0
+
+    def __enter__(self) -> Stage:
+        self.begin = perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        Profiler.add(self.name, perf_counter() - self.begin, self.bytes)
+
+class Off:
+    "what Profiler.stage returns while disabled, so a timed block costs one call"
+    __slots__ = ()
+    bytes = 0
+
+    def __enter__(self) -> Off:
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def __setattr__(self, *_):
+        pass
+
+class Profiler:
+    "cumulative seconds, calls and bytes of named stages, stages nest so parents include their children"
+    enabled: bool = False
+    interval: float = 0.5
+    stages: dict[str, list] = {}
+    lock = threading.Lock()
+    off = Off()
+    shown: float = 0.
+    started: float = 0.
+
+    @classmethod
+    def enable(cls):
+        with cls.lock:
+            cls.stages = {}
+
+        cls.started = perf_counter()
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        cls.enabled = False
+
+    @classmethod
+    def stage(cls, name: str) -> Stage | Off:
+        return Stage(name) if cls.enabled else cls.off
+
+    @classmethod
+    def add(cls, name: str, seconds: float, nbytes: int = 0, calls: int = 1):
+        with cls.lock:
+            entry = cls.stages.setdefault(name, [0., 0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+            entry[2] += nbytes
+
+    @classmethod
+    def postfix(cls, limit: int = 4) -> dict[str, str]:
+        "ms per call of the stages that took the longest in total, for tqdm.set_postfix"
+        with cls.lock:
+            stages = sorted(cls.stages.items(), key=lambda item: -item[1][0])[:limit]
+
+        return {name: f'{seconds / calls * 1000:.2f}ms' for name, (seconds, calls, _) in stages if calls}
+
+    @classmethod
+    def update(cls, bar):
+        "refresh the postfix of a tqdm bar at most every interval seconds"
+        if not cls.enabled:
+            return
+
+        now = perf_counter()
+        if now - cls.shown >= cls.interval:
+            cls.shown = now
+            bar.set_postfix(cls.postfix(), refresh=False)
+
+    @classmethod
+    def report(cls) -> dict:
+        with cls.lock:
+            stages = {
+                name: {'seconds': seconds, 'calls': calls, 'bytes': nbytes, 'ms_per_call': seconds / calls * 1000 if calls else 0.}
+                for name, (seconds, calls, nbytes) in sorted(cls.stages.items(), key=lambda item: -item[1][0])}
+
+        return {'wall': perf_counter() - cls.started, 'stages': stages}
+
+    @classmethod
+    def save(cls, file):
+        with open(file, 'w', encoding='utf-8') as ofile:
+            json.dump(cls.report(), ofile, indent=2)
+
+def timed(name: str):
+    "decorator counting every call of a function as the stage name"
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Profiler.enabled:
+                return func(*args, **kwargs)
+
+            begin = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                Profiler.add(name, perf_counter() - begin)
+
+        return wrapper
+    return decorate
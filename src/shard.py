@@ -0,0 +1,118 @@
+from __future__ import annotations
+import io
+import os
+import json
+
+import numpy as np
+
+MANIFEST = 'manifest.json'
+
+def trim(path: str, count: int):
+    "shrink a preallocated .npy to its first count rows by rewriting the header in place and truncating the file"
+    fmt = np.lib.format
+    with open(path, 'r+b') as sfile:
+        version = fmt.read_magic(sfile)
+        shape, fortran_order, dtype = (fmt.read_array_header_1_0 if version == (1, 0) else fmt.read_array_header_2_0)(sfile)
+        offset = sfile.tell()
+        header = io.BytesIO()
+        (fmt.write_array_header_1_0 if version == (1, 0) else fmt.write_array_header_2_0)(
+            header, {'descr': fmt.dtype_to_descr(dtype), 'fortran_order': fortran_order, 'shape': (count, *shape[1:])})
+        # numpy pads headers so the first axis can change in place, the copy is only for a header that does not fit
+        if header.tell() == offset:
+            sfile.seek(0)
+            sfile.write(header.getvalue())
+            sfile.truncate(offset + count * int(np.prod(shape[1:], dtype=np.int64)) * dtype.itemsize)
+            return
+
+    rows = np.load(path, mmap_mode='r')[:count].copy()
+    np.save(path, rows)
+
+class ShardWriter:
+    "appends frames to preallocated .npy shards and streams labels into raw companion arrays"
+    position_dtype = np.int16
+    click_dtype = np.uint8
+    
+    def __init__(self, directory: str, shard_size: int = 1024) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self.shards: list[dict] = []
+        self.current = None
+        self.shape = None
+        self.frames = 0
+        self.labels = {'positions': 0, 'clicks': 0}
+        self.positions = open(os.path.join(directory, 'positions.i16'), 'wb')
+        self.clicks = open(os.path.join(directory, 'clicks.u8'), 'wb')
+        
+    def __enter__(self) -> ShardWriter:
+        return self
+    
+    def __exit__(self, *_):
+        self.close()
+        
+    def __open(self, frame: np.ndarray):
+        self.__release()
+        name = f'frames_{len(self.shards):05d}.npy'
+        self.current = np.lib.format.open_memmap(
+            os.path.join(self.directory, name), mode='w+', dtype=np.uint8, shape=(self.shard_size, *frame.shape))
+        self.shards.append({'file': name, 'count': 0})
+        self.shape = list(frame.shape)
+        
+    def __release(self):
+        if self.current is not None:
+            self.current.flush()
+            self.current = None
+        
+    def write_frame(self, frame: np.ndarray):
+        if self.current is None or self.shards[-1]['count'] == self.shard_size:
+            self.__open(frame)
+            
+        shard = self.shards[-1]
+        self.current[shard['count']] = frame
+        shard['count'] += 1
+        self.frames += 1
+        
+    def write_labels(self, positions=(), clicks=()):
+        positions = np.asarray(positions, dtype=self.position_dtype).reshape(-1, 2)
+        clicks = np.asarray(clicks, dtype=self.click_dtype).reshape(-1)
+        positions.tofile(self.positions)
+        clicks.tofile(self.clicks)
+        self.labels['positions'] += len(positions)
+        self.labels['clicks'] += len(clicks)
+        
+    def close(self):
+        if self.positions.closed:
+            return
+        
+        self.__release()
+        if self.shards and self.shards[-1]['count'] < self.shard_size:
+            trim(os.path.join(self.directory, self.shards[-1]['file']), self.shards[-1]['count'])
+            
+        self.positions.close()
+        self.clicks.close()
+        with open(os.path.join(self.directory, MANIFEST), 'w', encoding='utf-8') as mfile:
+            json.dump({
+                'frames': self.frames,
+                'shard_size': self.shard_size,
+                'frame_shape': self.shape,
+                'dtype': 'uint8',
+                'shards': self.shards,
+                'positions': {'file': 'positions.i16', 'dtype': 'int16', 'shape': [self.labels['positions'], 2]},
+                'clicks': {'file': 'clicks.u8', 'dtype': 'uint8', 'shape': [self.labels['clicks']]}}, mfile, indent=2)
+            
+def load_shards(directory: str) -> tuple[list[np.ndarray], np.ndarray, np.ndarray]:
+    "memory-mapped frame shards, positions and clicks"
+    with open(os.path.join(directory, MANIFEST), 'r', encoding='utf-8') as mfile:
+        manifest = json.load(mfile)
+        
+    frames = [np.load(os.path.join(directory, shard['file']), mmap_mode='r')[:shard['count']] for shard in manifest['shards']]
+    labels = []
+    for key in ('positions', 'clicks'):
+        spec = manifest[key]
+        path = os.path.join(directory, spec['file'])
+        if spec['shape'][0] == 0:
+            labels.append(np.zeros(spec['shape'], dtype=spec['dtype']))
+        else:
+            labels.append(np.memmap(path, dtype=spec['dtype'], mode='r', shape=tuple(spec['shape'])))
+        
+    return frames, *labels
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import queue
+import threading
+
+import numpy as np
+
+from .profiler import Profiler
+
+class FrameBatches:
+    "(B, H, W, C) uint8 frames with (B, 2) positions and (B,) clicks, filled on a background thread into prefetch + 1 reused buffers"
+    end = object()
+
+    def __init__(self, convertor, batch_size=32, stride=1, shuffle=0, seed=None, prefetch=2, drop_last=False) -> None:
+        if batch_size < 1 or stride < 1 or shuffle < 0:
+            raise ValueError('batch_size and stride must be positive and shuffle not negative')
+
+        self.convertor = convertor
+        self.batch_size = batch_size
+        self.stride = stride
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.rng = np.random.default_rng(seed)
+        self.slots = max(prefetch, 1) + 1
+        self.buffers = None
+        self.free = queue.Queue()
+        self.ready = queue.Queue()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def __repr__(self):
+        return f'<FrameBatches batch_size: {self.batch_size}, stride: {self.stride}, shuffle: {self.shuffle}>'
+
+    def __len__(self):
+        "number of batches"
+        count = -(-len(self.convertor.labels()) // self.stride)
+        return count // self.batch_size if self.drop_last else -(-count // self.batch_size)
+
+    def __enter__(self) -> FrameBatches:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __iter__(self):
+        if self.thread is not None:
+            raise RuntimeError('FrameBatches can only be iterated once')
+
+        for slot in range(self.slots):
+            self.free.put(slot)
+
+        self.thread = threading.Thread(target=self.__run, name='frame-batches', daemon=True)
+        self.thread.start()
+        held = None
+        try:
+            while True:
+                with Profiler.stage('batch.wait'):
+                    item = self.ready.get()
+
+                if held is not None:
+                    self.free.put(held)
+                    held = None
+
+                if item is self.end:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+
+                held, count = item
+                frames, positions, clicks = (buffer[held] for buffer in self.buffers)
+                yield frames[:count], positions[:count], clicks[:count]
+        finally:
+            self.close()
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            while self.thread.is_alive():
+                self.free.put(None)
+                self.thread.join(0.1)
+
+    def __allocate(self, shape: tuple[int, ...]):
+        self.buffers = (
+            np.empty((self.slots, self.batch_size, *shape), dtype=np.uint8),
+            np.empty((self.slots, self.batch_size, 2), dtype=np.int64),
+            np.empty((self.slots, self.batch_size), dtype=np.uint8))
+        self.window = (
+            np.empty((self.shuffle, *shape), dtype=np.uint8),
+            np.empty((self.shuffle, 2), dtype=np.int64),
+            np.empty(self.shuffle, dtype=np.uint8))
+
+    def __run(self):
+        slot, count = None, 0
+
+        def emit(frame, position, click) -> bool:
+            "copy one sample into the batch being filled, handing it over once full"
+            nonlocal slot, count
+            if slot is None:
+                slot = self.free.get()
+                if slot is None or self.stopped.is_set():
+                    return False
+
+            frames, positions, clicks = self.buffers
+            frames[slot, count] = frame
+            positions[slot, count] = position
+            clicks[slot, count] = click
+            count += 1
+            if count == self.batch_size:
+                self.ready.put((slot, count))
+                slot, count = None, 0
+
+            return True
+
+        try:
+            convertor = self.convertor
+            prep = convertor.preprocess()
+            positions, clicks = convertor.label_arrays()
+            filled = 0
+            for i, frame in convertor.decode(step=self.stride):
+                if self.stopped.is_set():
+                    return
+
+                with Profiler.stage('preprocess'):
+                    frame = prep.frame(frame)
+
+                if frame.ndim == 2:
+                    frame = frame[..., None]
+                if self.buffers is None:
+                    self.__allocate(frame.shape)
+
+                sample = frame, positions[i], clicks[i]
+                if self.shuffle:
+                    if filled < self.shuffle:
+                        j, filled = filled, filled + 1
+                    else:
+                        j = self.rng.integers(self.shuffle)
+                        if not emit(*(window[j] for window in self.window)):
+                            return
+
+                    for window, value in zip(self.window, sample):
+                        window[j] = value
+                elif not emit(*sample):
+                    return
+
+            for j in self.rng.permutation(filled):
+                if not emit(*(window[j] for window in self.window)):
+                    return
+
+            if count and not self.drop_last:
+                self.ready.put((slot, count))
+        except BaseException as error:
+            self.ready.put(error)
+        finally:
+            self.ready.put(self.end)
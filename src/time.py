@@ -1,6 +1,8 @@
 from __future__ import annotations
 from typing import Optional
 
+import numpy as np
+
 class TimePoint:
     ninherit: bool
     start: int
@@ -23,4 +25,36 @@ class TimePoint:
         return f'<TimePoint start: {self.start}, bpm: {self.bpm}, slide_speed: {self.multiple}>'
     
     def __iter__(self):
-        yield from [self.start, self.step, self.speed, self.ninherit]
\ No newline at end of file
+        yield from [self.start, self.step, self.speed, self.ninherit]
+        
+class TimingIndex:
+    "timing points as arrays for searchsorted lookup of the active section"
+    starts: np.ndarray
+    base_steps: np.ndarray
+    multiples: np.ndarray
+    
+    def __init__(self, time_points: tuple[TimePoint, ...]):
+        self.time_points = time_points
+        self.starts = np.array([point.start for point in time_points], dtype=np.int64)
+        self.base_steps = np.array([point.base_step for point in time_points], dtype=np.float64)
+        self.multiples = np.array([point.multiple for point in time_points], dtype=np.float64)
+        # the running maximum keeps the "last point of the leading run with start <= time" rule for unsorted files
+        self.bounds = np.maximum.accumulate(self.starts)
+        
+    def __len__(self):
+        return len(self.time_points)
+        
+    def __repr__(self):
+        return f'<TimingIndex points: {len(self)}>'
+        
+    def lookup(self, times) -> np.ndarray:
+        "index of the active timing point for every time"
+        return np.maximum(np.searchsorted(self.bounds, times, side='right') - 1, 0)
+    
+    def __getitem__(self, time: int) -> TimePoint:
+        return self.time_points[int(self.lookup(time))]
+    
+    def durations(self, times, lengths, slider_multiplier: float) -> np.ndarray:
+        "duration of one pass of every slider"
+        index = self.lookup(times)
+        return np.asarray(lengths, dtype=np.float64) / (100 * slider_multiplier * self.multiples[index]) * self.base_steps[index]
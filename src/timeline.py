@@ -0,0 +1,49 @@
+from __future__ import annotations
+from .pixel import Pixel
+
+import numpy as np
+
+class Timeline:
+    "struct of arrays of every sampled (time, x, y) of a beatmap, in object order"
+    time: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    object: np.ndarray
+    type: np.ndarray
+    
+    def __init__(self, time, x, y, object, type):
+        self.time = np.ascontiguousarray(time, dtype=np.int32)
+        self.x = np.ascontiguousarray(x, dtype=np.float32)
+        self.y = np.ascontiguousarray(y, dtype=np.float32)
+        self.object = np.ascontiguousarray(object, dtype=np.int32)
+        self.type = np.ascontiguousarray(type, dtype=np.int8)
+        
+    def __len__(self):
+        return len(self.time)
+    
+    def __repr__(self):
+        return f'<Timeline samples: {len(self)}, objects: {self.object[-1] + 1 if len(self) else 0}>'
+    
+    def __iter__(self):
+        for time, x, y in zip(self.time.tolist(), self.x.tolist(), self.y.tolist()):
+            yield Pixel(int(x), int(y)), time
+            
+    @property
+    def positions(self) -> np.ndarray:
+        return np.column_stack((self.x, self.y))
+    
+    @property
+    def bounds(self) -> np.ndarray:
+        "start offset of every object, followed by the total length"
+        return np.searchsorted(self.object, np.arange(self.object[-1] + 2 if len(self) else 1))
+    
+    @classmethod
+    def from_objects(cls, objects) -> Timeline:
+        counts = [len(object.times) for object in objects]
+        if not counts:
+            return cls(*([],) * 5)
+        
+        points = np.concatenate([np.asarray(object.points, dtype=np.float64).reshape(-1, 2) for object in objects])
+        ids = np.repeat(np.arange(len(objects)), counts)
+        types = np.repeat([int(object.ty) for object in objects], counts)
+        return cls(np.concatenate([np.asarray(object.times) for object in objects]), points[:, 0], points[:, 1], ids, types)
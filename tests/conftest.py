@@ -0,0 +1,59 @@
+import os
+import sys
+import zipfile
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'benchmarks'))
+
+from src import Convertor
+from src.checkpoint import Checkpoint
+from synthetic import generate_osu, generate_video
+
+class Interrupted(Exception):
+    pass
+
+@pytest.fixture(scope='session')
+def sources(tmp_path_factory):
+    "a small synthetic beatmap and a 4 second 320x180 video"
+    directory = tmp_path_factory.mktemp('sources')
+    osu, video = str(directory / 'synthetic.osu'), str(directory / 'synthetic.avi')
+    generate_osu(osu, circles=20, b_sliders=5, p_sliders=5, l_sliders=5, spinners=0, timing_points=4)
+    generate_video(video, 4, size=(320, 180), fourcc='MJPG')
+    return osu, video
+
+@pytest.fixture
+def convertor(sources):
+    "makes quiet convertors over the synthetic sources, keywords override the defaults"
+    def make(**options) -> Convertor:
+        osu, video = sources
+        convertor = Convertor(osu, video, **{'size': (320, 180), 'start': 0, 'end': 3000, 'cache': False, **options})
+        convertor.progress = False
+        return convertor
+    return make
+
+@pytest.fixture
+def members():
+    "every entry of a zip in order, so duplicated names show up"
+    def read(file) -> list[tuple[str, bytes]]:
+        with zipfile.ZipFile(file) as zfile:
+            return [(info.filename, zfile.read(info)) for info in zfile.infolist()]
+    return read
+
+@pytest.fixture
+def interrupt(monkeypatch):
+    "runs to_data until the checkpoint after frame after, frames past the last save are already in the zip"
+    def run(convertor: Convertor, file, after=40, checkpoint=20):
+        save = Checkpoint.save
+        def dying(self, zfile, frame):
+            if frame > after:
+                raise Interrupted
+            return save(self, zfile, frame)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(Checkpoint, 'save', dying)
+            with pytest.raises(Interrupted):
+                convertor.to_data(file, workers=2, checkpoint=checkpoint)
+    return run
@@ -0,0 +1,32 @@
+import json
+import os
+
+from src.batch import run_batch
+
+def cvt(path, osu, osr):
+    path.write_text(f'osu={osu}\nosr={osr}\nsize=320,180\nend=2000\n', encoding='utf-8')
+
+def test_restart_skips_done_and_retries_failed(sources, tmp_path, monkeypatch):
+    osu, video = sources
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'convertors').mkdir()
+    broken = tmp_path / 'broken.osu'
+    broken.write_text('osu file format v14\n', encoding='utf-8')
+    cvt(tmp_path / 'convertors' / 'a.cvt', osu, video)
+    cvt(tmp_path / 'convertors' / 'b.cvt', broken, video)
+    outputs = {'convert': str(tmp_path / 'zips')}
+
+    jobs = run_batch('.', outputs, 'batch.json', processes=1)
+    assert jobs['a.cvt']['status'] == 'done' and jobs['b.cvt']['status'] == 'failed'
+    assert (tmp_path / 'zips' / 'a.zip').exists()
+    assert not (tmp_path / 'zips' / 'b.zip').exists() and jobs['b.cvt']['size'] == 0
+
+    done = jobs['a.cvt']
+    os.utime(tmp_path / 'zips' / 'a.zip', (0, 0))
+    cvt(tmp_path / 'convertors' / 'b.cvt', osu, video)
+    jobs = run_batch('.', outputs, 'batch.json', processes=1)
+    assert jobs['a.cvt'] == done and (tmp_path / 'zips' / 'a.zip').stat().st_mtime == 0
+    assert jobs['b.cvt']['status'] == 'done' and (tmp_path / 'zips' / 'b.zip').exists()
+
+    with open('batch.json', encoding='utf-8') as mfile:
+        assert json.load(mfile)['jobs'] == jobs
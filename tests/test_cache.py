@@ -0,0 +1,95 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from src.cache import BeatmapCache
+from src.timeline import Timeline
+
+def timeline(count=100, seed=0) -> Timeline:
+    rng = np.random.default_rng(seed)
+    return Timeline(np.arange(count) * 10, rng.integers(0, 512, count), rng.integers(0, 384, count), np.arange(count) // 4, np.ones(count))
+
+def test_store_into_unwritable_directory_is_skipped(tmp_path):
+    (tmp_path / 'file').write_bytes(b'')
+    cache = BeatmapCache(str(tmp_path / 'file' / 'cache'))
+    cache.store('key', timeline())
+    assert cache.load('key') is None
+
+def test_store_failure_removes_temp(tmp_path, monkeypatch):
+    def full(*_, **__):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(np, 'savez', full)
+    cache = BeatmapCache(str(tmp_path))
+    cache.store('key', timeline())
+    assert list(tmp_path.iterdir()) == []
+
+def test_threads_store_the_same_key(tmp_path):
+    cache = BeatmapCache(str(tmp_path))
+    errors = []
+    def store():
+        try:
+            for _ in range(20):
+                cache.store('key', timeline())
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=store) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert [path.name for path in tmp_path.iterdir()] == ['key.npz']
+    assert np.array_equal(cache.load('key').x, timeline().x)
+
+def test_hit_and_miss(tmp_path):
+    cache = BeatmapCache(str(tmp_path))
+    key = cache.key(b'osu content', 16.6, 0.25)
+    assert cache.load(key) is None
+
+    cache.store(key, timeline())
+    loaded = cache.load(key)
+    for column in ('time', 'x', 'y', 'object', 'type'):
+        assert np.array_equal(getattr(loaded, column), getattr(timeline(), column))
+    assert cache.key(b'osu content', 16.6, 0.5) != key
+
+def test_truncated_entry_is_a_miss(tmp_path):
+    cache = BeatmapCache(str(tmp_path))
+    cache.store('key', timeline())
+    path = tmp_path / 'key.npz'
+    path.write_bytes(path.read_bytes()[:100])
+    assert cache.load('key') is None
+
+def test_evicts_least_recently_used_down_to_max_bytes(tmp_path):
+    cache = BeatmapCache(str(tmp_path), max_bytes=1 << 40)
+    for i in range(6):
+        cache.store(f'key{i}', timeline(seed=i))
+    size = (tmp_path / 'key0.npz').stat().st_size
+    for i, path in enumerate(sorted(tmp_path.iterdir())):
+        os.utime(path, (i, i))
+    cache.load('key0')
+
+    cache.max_bytes = 3 * size
+    cache.evict()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['key0.npz', 'key4.npz', 'key5.npz']
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= cache.max_bytes
+
+def test_evict_tolerates_entries_removed_meanwhile(tmp_path, monkeypatch):
+    cache = BeatmapCache(str(tmp_path))
+    for i in range(3):
+        cache.store(f'key{i}', timeline(seed=i))
+
+    cache.max_bytes = 0
+    scandir = os.scandir
+    def racing(directory):
+        entries = list(scandir(directory))
+        os.remove(entries[0].path)
+        return entries
+
+    monkeypatch.setattr(os, 'scandir', racing)
+    cache.evict()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+import json
+import zipfile
+
+import pytest
+
+from src import Convertor
+from src.checkpoint import Checkpoint
+
+def test_restore_after_crash(tmp_path, members):
+    file = str(tmp_path / 'data.zip')
+    saves = Checkpoint(file, {'run': 1})
+    zfile = zipfile.ZipFile(file, 'w')
+    for i in range(10):
+        zfile.writestr(f'images/{i}.png', bytes([i]) * 100)
+    zfile = saves.save(zfile, 10)
+    for i in range(10, 15):
+        zfile.writestr(f'images/{i}.png', bytes([i]) * 100)
+    zfile.fp.flush()
+
+    # killed mid write: no central directory and a torn last member
+    with open(file, 'r+b') as ofile:
+        ofile.truncate(ofile.seek(0, 2) - 50)
+
+    resumed = Checkpoint(file, {'run': 1})
+    assert resumed.restore() and resumed.frame == 10
+    assert [name for name, _ in members(file)] == [f'images/{i}.png' for i in range(10)]
+
+    with zipfile.ZipFile(file, 'a') as zfile:
+        zfile.writestr('images/10.png', b'next')
+    assert members(file)[-1] == ('images/10.png', b'next')
+
+def test_restore_other_fingerprint(tmp_path):
+    file = str(tmp_path / 'data.zip')
+    saves = Checkpoint(file, {'profile': 'png'})
+    saves.save(zipfile.ZipFile(file, 'w'), 0).close()
+
+    other = Checkpoint(file, {'profile': 'raw'})
+    with pytest.warns(UserWarning):
+        assert not other.restore()
+    assert other.frame == 0 and not (tmp_path / 'data.zip.ckpt').exists()
+
+def decoded_from(monkeypatch) -> list[int]:
+    "the skip of every decode call, to tell a resumed run from one that started over"
+    skips = []
+    decode = Convertor.decode
+    def spy(self, skip=0, step=1):
+        skips.append(skip)
+        return decode(self, skip, step)
+
+    monkeypatch.setattr(Convertor, 'decode', spy)
+    return skips
+
+def saved_frame(file) -> int:
+    with open(file + '.ckpt', 'rb') as cfile:
+        return json.loads(cfile.readline())['frame']
+
+def test_to_data_resumes(convertor, interrupt, members, tmp_path, monkeypatch):
+    full, file = str(tmp_path / 'full.zip'), str(tmp_path / 'data.zip')
+    convertor().to_data(full, workers=2)
+    interrupt(convertor(), file)
+    assert saved_frame(file) == 40
+
+    skips = decoded_from(monkeypatch)
+    convertor().to_data(file, workers=2, checkpoint=20)
+    assert skips == [40]
+    assert members(file) == members(full)
+    assert not (tmp_path / 'data.zip.ckpt').exists()
+
+def test_to_data_starts_over_for_another_profile(convertor, interrupt, members, tmp_path, monkeypatch):
+    full, file = str(tmp_path / 'full.zip'), str(tmp_path / 'data.zip')
+    convertor().to_data(full, workers=2, profile='raw')
+    interrupt(convertor(), file)
+
+    skips = decoded_from(monkeypatch)
+    with pytest.warns(UserWarning):
+        convertor().to_data(file, workers=2, checkpoint=20, profile='raw')
+    assert skips == [0]
+    assert members(file) == members(full)
@@ -0,0 +1,101 @@
+import json
+import random
+import threading
+import zipfile
+
+import numpy as np
+import pytest
+
+from src.dataset import ZipDataset
+from src.encoding import EncodingProfile, get_profile
+
+COUNT = 12
+
+def frame(i: int) -> np.ndarray:
+    return np.random.default_rng(i).integers(0, 256, (18, 32, 3), dtype=np.uint8)
+
+def write(file, profile: str):
+    profile = get_profile(profile)
+    with zipfile.ZipFile(file, 'w') as zfile:
+        for i in range(COUNT):
+            profile.writestr(zfile, i, profile.encode(frame(i)))
+        zfile.writestr('position.json', json.dumps([[i, 2 * i] for i in range(COUNT)]))
+        zfile.writestr('click.json', json.dumps([i % 2 for i in range(COUNT)]))
+    return file
+
+@pytest.fixture
+def data(tmp_path):
+    with ZipDataset(write(str(tmp_path / 'data.zip'), 'raw'), cache_bytes=3 * frame(0).nbytes, workers=4) as data:
+        yield data
+
+def test_concurrent_reads_keep_the_lru_consistent(data):
+    errors = []
+    def read(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(300):
+                i = rng.randrange(COUNT)
+                assert np.array_equal(data[i][0], frame(i))
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=read, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert data.cached == sum(cached.nbytes for cached in data.cache.values()) <= data.cache_bytes
+
+@pytest.mark.parametrize('profile, method', [
+    ('png', zipfile.ZIP_STORED),
+    ('raw', zipfile.ZIP_STORED),
+    ('raw-deflate', zipfile.ZIP_DEFLATED),
+    (EncodingProfile('raw-bzip2', '.npy', compression=zipfile.ZIP_BZIP2), zipfile.ZIP_BZIP2),
+])
+def test_members(tmp_path, profile, method):
+    with ZipDataset(write(str(tmp_path / 'data.zip'), profile)) as data:
+        assert len(data) == COUNT
+        assert (data.method == method).all()
+        for i in range(COUNT):
+            image, position, click = data[i]
+            assert np.array_equal(image, frame(i))
+            assert position.tolist() == [i, 2 * i] and click == i % 2
+
+def test_indexing(data):
+    image, position, click = data[-1]
+    assert np.array_equal(image, frame(COUNT - 1)) and position.tolist() == [COUNT - 1, 2 * (COUNT - 1)]
+
+    images, positions, clicks = data[2:8:3]
+    assert images.shape == (2, 18, 32, 3)
+    assert np.array_equal(images, np.stack([frame(2), frame(5)]))
+    assert positions.tolist() == [[2, 4], [5, 10]] and clicks.tolist() == [0, 1]
+
+    images, positions, clicks = data[np.array([3, -2, 3])]
+    assert np.array_equal(images, np.stack([frame(3), frame(COUNT - 2), frame(3)]))
+    assert positions[:, 0].tolist() == [3, COUNT - 2, 3]
+
+    images, positions, clicks = data[[]]
+    assert len(images) == len(positions) == len(clicks) == 0
+
+@pytest.mark.parametrize('index', [COUNT, -COUNT - 1])
+def test_out_of_range(data, index):
+    with pytest.raises(IndexError):
+        data[index]
+
+def test_evicts_least_recently_used_by_bytes(data):
+    data.frames([0, 1, 2])
+    data.frames([0])
+    data.frames([3])
+    assert list(data.cache) == [2, 0, 3]
+    assert data.cached == 3 * frame(0).nbytes
+
+    data.cache_bytes = frame(0).nbytes - 1
+    data.frames([4])
+    assert 4 not in data.cache
+
+def test_cached_frames_are_read_only(data):
+    image = data[0][0]
+    with pytest.raises(ValueError):
+        image[0, 0, 0] = 1
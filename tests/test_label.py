@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from src.file import File
+from src.label import LabelTable
+from src.pixel import Pixel
+from synthetic import generate_osu
+
+N = 1 / 60 * 1000
+
+def per_frame(timeline, delay, n) -> tuple[list, list]:
+    "the original Convertor.__iter__ and to_data loops, one Pixel per frame"
+    start = -delay
+    prev_time = 0
+    frames = 0
+    labels = []
+    for position, time in timeline:
+        while start + n * frames < time:
+            frames += 1
+            click = (time - prev_time) / n < 1.3 or (start + n * frames - time) / n > -0.3
+            labels.append(position if click else None)
+
+        prev_time = time
+
+    positions = []
+    prev = Pixel(256, 192)
+    length = 0
+    for curr in labels:
+        if curr is None:
+            length += 1
+            continue
+
+        if length:
+            positions.extend((prev + (curr - prev) * s).round() for s in np.linspace(1 / length, 1, length))
+            length = 0
+
+        positions.append(curr)
+        prev = curr
+
+    positions.extend([prev] * length)
+    return positions, [int(label is not None) for label in labels]
+
+@pytest.fixture(scope='module')
+def timeline(tmp_path_factory):
+    path = tmp_path_factory.mktemp('osu') / 'synthetic.osu'
+    generate_osu(str(path), circles=60, b_sliders=20, p_sliders=20, l_sliders=20, spinners=3, timing_points=10)
+    return File(str(path), n=N).timeline
+
+@pytest.mark.parametrize('delay', [0, 500, -300])
+def test_build_matches_per_frame(timeline, delay):
+    positions, clicks = per_frame(timeline, delay, N)
+    table = LabelTable.build(timeline, delay, N)
+
+    assert len(table) == len(clicks)
+    assert table.frame.tolist() == list(range(len(clicks)))
+    assert table.click.tolist() == clicks
+    assert table.positions.tolist() == [[p.x, p.y] for p in positions]
+
+def test_fill_gaps():
+    x = np.array([0, 0, 10, 0, 0, 0, 50, 0, 0], dtype=np.float64)
+    y = np.array([0, 0, 20, 0, 0, 0, 60, 0, 0], dtype=np.float64)
+    click = np.array([0, 0, 1, 0, 0, 0, 1, 0, 0])
+    LabelTable.fill_gaps(x, y, click)
+
+    # like np.linspace(1 / length, 1, length), the last frame of a gap already sits on the next click;
+    # a leading gap starts from the playfield centre and a trailing one holds the last click
+    assert x.tolist() == [133, 10, 10, 23, 37, 50, 50, 50, 50]
+    assert y.tolist() == [106, 20, 20, 33, 47, 60, 60, 60, 60]
+
+def test_fill_gaps_without_clicks():
+    x, y = np.zeros(4), np.zeros(4)
+    LabelTable.fill_gaps(x, y, np.zeros(4))
+    assert x.tolist() == [256] * 4 and y.tolist() == [192] * 4
+
+@pytest.mark.parametrize('rates', [{'fps': 30}, {'source_fps': 30}, {'fps': 30, 'source_fps': 60}])
+def test_to_labels_never_opens_the_video(convertor, members, tmp_path, monkeypatch, rates):
+    def opened(*_):
+        raise AssertionError('the video was opened')
+
+    monkeypatch.setattr('src.convertor.probe_fps', opened)
+    monkeypatch.setattr('src.convertor.cv2.VideoCapture', opened)
+    convertor(**rates).to_labels(str(tmp_path / 'labels.zip'))
+    assert [name for name, _ in members(str(tmp_path / 'labels.zip'))] == ['position.json', 'click.json']
+
+def test_to_labels_needs_a_rate(convertor, tmp_path):
+    with pytest.raises(ValueError):
+        convertor().to_labels(str(tmp_path / 'labels.zip'))
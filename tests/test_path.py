@@ -0,0 +1,32 @@
+from math import comb
+
+import numpy as np
+import pytest
+
+from src.path import flatten_bezier
+
+def bernstein(points: np.ndarray, count: int) -> np.ndarray:
+    t = np.linspace(0, 1, count)[:, None]
+    m = len(points) - 1
+    return sum(comb(m, k) * t ** k * (1 - t) ** (m - k) * points[k] for k in range(m + 1))
+
+@pytest.mark.parametrize('seed', range(20))
+def test_flatten_bezier_endpoints_and_length(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.integers(0, 512, (rng.integers(3, 9), 2)).astype(np.float64)
+    polyline, lengths = flatten_bezier(points)
+
+    assert np.array_equal(polyline[0], points[0])
+    assert np.array_equal(polyline[-1], points[-1])
+    assert np.all(np.diff(lengths) >= 0)
+    assert lengths[-1] == pytest.approx(np.hypot(*np.diff(polyline, axis=0).T).sum())
+    assert lengths[-1] == pytest.approx(np.hypot(*np.diff(bernstein(points, 20001), axis=0).T).sum(), rel=1e-3)
+
+def test_flatten_bezier_straight_line():
+    _, lengths = flatten_bezier([(0, 0), (30, 40), (60, 80)])
+    assert lengths[-1] == pytest.approx(100)
+
+@pytest.mark.parametrize('tolerance', [0, -1, float('nan')])
+def test_flatten_bezier_rejects_tolerance(tolerance):
+    with pytest.raises(ValueError):
+        flatten_bezier([(0, 0), (50, 80), (100, 0)], tolerance)
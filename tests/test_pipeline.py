@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from src.encoding import PROFILES
+
+@pytest.mark.parametrize('name', PROFILES)
+@pytest.mark.parametrize('shape', [(180, 320, 3), (8, 8), (1, 1, 3), (2, 1000, 3), (1000, 2)])
+def test_bound_holds_for_noise(name, shape):
+    profile = PROFILES[name]
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    assert len(profile.encode(frame)) <= profile.bound(shape)
+
+@pytest.mark.parametrize('profile', ['png', 'raw'])
+def test_matches_threads(convertor, members, tmp_path, profile):
+    threads, processes = str(tmp_path / 'threads.zip'), str(tmp_path / 'processes.zip')
+    convertor().to_data(threads, workers=2, profile=profile)
+    convertor().to_data(processes, profile=profile, encoders=2)
+    assert members(processes) == members(threads)
+
+def test_resumes_checkpoint(convertor, interrupt, members, tmp_path):
+    full, file = str(tmp_path / 'full.zip'), str(tmp_path / 'data.zip')
+    convertor().to_data(full, workers=2)
+    interrupt(convertor(), file)
+    assert (tmp_path / 'data.zip.ckpt').exists()
+
+    convertor().to_data(file, checkpoint=20, encoders=2)
+    assert members(file) == members(full)
+    assert not (tmp_path / 'data.zip.ckpt').exists()
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.pixel import Pixel, PixelArray
+
+def test_offset_applies_per_column():
+    pixels = PixelArray([[0, 0], [10, 10]])
+    assert (pixels + (1, 2)).data.tolist() == [[1, 2], [11, 12]]
+    assert ((1, 2) + pixels).data.tolist() == [[1, 2], [11, 12]]
+    assert (pixels - Pixel(1, 2)).data.tolist() == [[-1, -2], [9, 8]]
+    assert ((20, 30) - pixels).data.tolist() == [[20, 30], [10, 20]]
+    assert (pixels * (2, 3)).data.tolist() == [[0, 0], [20, 30]]
+
+def test_scalar_and_rows():
+    pixels = PixelArray([[1, 2], [3, 4], [5, 6]])
+    assert (pixels * 2).data.tolist() == [[2, 4], [6, 8], [10, 12]]
+    assert (pixels / 2).round().data.tolist() == [[0, 1], [2, 2], [2, 3]]
+    assert (pixels + pixels).data.tolist() == [[2, 4], [6, 8], [10, 12]]
+    assert (pixels - [[1, 1], [2, 2], [3, 3]]).data.tolist() == [[0, 1], [1, 2], [2, 3]]
+
+def test_other_shapes_are_rejected():
+    with pytest.raises(ValueError):
+        PixelArray([[1, 2], [3, 4], [5, 6]]) + (1, 2, 3)
+
+def test_pixel_times_array():
+    pixels = Pixel(10, 20) * np.array([0., 0.5, 1.])
+    assert isinstance(pixels, PixelArray)
+    assert pixels.data.tolist() == [[0, 0], [5, 10], [10, 20]]
+    assert list(pixels)[1] == Pixel(5, 10)
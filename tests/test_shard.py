@@ -0,0 +1,26 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.shard import ShardWriter, load_shards
+
+def frame(i: int) -> np.ndarray:
+    return np.full((6, 8, 3), i % 256, dtype=np.uint8)
+
+@pytest.mark.parametrize('count, sizes', [(130, [64, 64, 2]), (128, [64, 64]), (5, [5])])
+def test_shards_load_directly(tmp_path, count, sizes):
+    with ShardWriter(str(tmp_path), shard_size=64) as writer:
+        for i in range(count):
+            writer.write_frame(frame(i))
+            writer.write_labels([(i, -i)], [i % 2])
+
+    files = sorted(name for name in os.listdir(tmp_path) if name.startswith('frames_'))
+    shards = [np.load(tmp_path / name, mmap_mode='r') for name in files]
+    assert [len(shard) for shard in shards] == sizes
+    assert np.array_equal(np.concatenate(shards), np.stack([frame(i) for i in range(count)]))
+    assert (tmp_path / files[-1]).stat().st_size == shards[-1].offset + shards[-1].nbytes
+
+    frames, positions, clicks = load_shards(str(tmp_path))
+    assert [len(shard) for shard in frames] == sizes
+    assert positions[-1].tolist() == [count - 1, 1 - count] and clicks.sum() == count // 2
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from src.preprocess import Preprocess
+from src.stream import FrameBatches
+
+class Frames:
+    "count 2x2 frames filled with their index, with matching positions and clicks"
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.positions = np.column_stack((np.arange(count), -np.arange(count)))
+        self.clicks = (np.arange(count) % 2).astype(np.uint8)
+
+    def labels(self):
+        return range(self.count)
+
+    def preprocess(self) -> Preprocess:
+        return Preprocess()
+
+    def label_arrays(self):
+        return self.positions, self.clicks
+
+    def decode(self, skip=0, step=1):
+        for i in range(skip, self.count, step):
+            yield i, np.full((2, 2, 1), i % 256, dtype=np.uint8)
+
+def collect(batches: FrameBatches) -> list[tuple]:
+    return [tuple(array.copy() for array in batch) for batch in batches]
+
+@pytest.mark.parametrize('shuffle', [0, 7, 64])
+def test_every_sample_once(shuffle):
+    batches = collect(FrameBatches(Frames(100), batch_size=8, shuffle=shuffle, seed=1))
+    frames, positions, clicks = (np.concatenate(arrays) for arrays in zip(*batches))
+    index = frames[:, 0, 0, 0].astype(np.int64)
+
+    assert sorted(index) == list(range(100))
+    assert (index != np.arange(100)).any() == bool(shuffle)
+    assert positions.tolist() == [[i, -i] for i in index]
+    assert clicks.tolist() == [i % 2 for i in index]
+
+@pytest.mark.parametrize('stride, drop_last, sizes', [
+    (1, False, [8] * 12 + [4]),
+    (1, True, [8] * 12),
+    (3, False, [8] * 4 + [2]),
+    (3, True, [8] * 4),
+    (200, False, [1]),
+    (200, True, []),
+])
+def test_counts(stride, drop_last, sizes):
+    batches = FrameBatches(Frames(100), batch_size=8, stride=stride, drop_last=drop_last)
+    assert len(batches) == len(sizes)
+    collected = collect(batches)
+    assert [len(frames) for frames, _, _ in collected] == sizes
+    index = [int(frame[0, 0, 0]) for frames, _, _ in collected for frame in frames]
+    assert index == list(range(0, 100, stride))[:sum(sizes)]
+
+def test_buffers_are_reused():
+    seen = []
+    for frames, _, _ in FrameBatches(Frames(100), batch_size=4, prefetch=2):
+        seen.append(frames)
+
+    # prefetch + 1 buffers cycle, so a batch is overwritten once the consumer is a few batches further
+    assert len({id(frames.base) for frames in seen}) <= 3
+    assert np.shares_memory(seen[0], seen[3])
+    assert seen[0][0, 0, 0, 0] != 0
+
+def test_stops_when_the_consumer_breaks():
+    batches = FrameBatches(Frames(10000), batch_size=4)
+    for _ in batches:
+        break
+
+    assert not batches.thread.is_alive()
+
+def test_stops_on_close():
+    with FrameBatches(Frames(10000), batch_size=4) as batches:
+        iterator = iter(batches)
+        next(iterator)
+    assert not batches.thread.is_alive()
+
+def test_convertor(convertor):
+    source = convertor()
+    positions, clicks = source.label_arrays()
+    batches = collect(source.batches(16, stride=2))
+    assert sum(len(frames) for frames, _, _ in batches) == len(range(0, len(clicks), 2))
+    assert np.array_equal(np.concatenate([batch[1] for batch in batches]), positions[::2])
+    assert np.array_equal(np.concatenate([batch[2] for batch in batches]), clicks[::2])
+    assert batches[0][0].shape[1:] == (180, 320, 3)
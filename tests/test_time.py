@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src.time import TimePoint, TimingIndex
+
+def scan(starts, time) -> int:
+    "the original rule: the last point of the leading run that starts at or before time"
+    index = 0
+    for i, start in enumerate(starts):
+        if start > time:
+            break
+        index = i
+    return index
+
+def timing(starts) -> TimingIndex:
+    first = TimePoint((str(starts[0]), '333.3', '4', '2', '0', '60', '1', '0'))
+    points = [first]
+    for start in starts[1:]:
+        points.append(TimePoint((str(start), '-100', '4', '2', '0', '60', '0', '0'), points[-1]))
+    return TimingIndex(tuple(points))
+
+@pytest.mark.parametrize('starts', [
+    [0, 1000, 2000, 3000],
+    [0, 2000, 1000, 3000],
+    [500, 3000, 1000, 1000, 2000, 4000],
+    [1000, 0, 0, 500],
+    [2000, 2000, 1000],
+])
+def test_lookup_unsorted(starts):
+    index = timing(starts)
+    times = np.arange(-100, 4600, 50)
+    assert index.lookup(times).tolist() == [scan(starts, time) for time in times]
+    assert all(index[time] is index.time_points[scan(starts, time)] for time in times)
+
+def test_lookup_shuffled():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 10000, 40).tolist()
+    index = timing(starts)
+    times = rng.integers(-500, 11000, 500)
+    assert index.lookup(times).tolist() == [scan(starts, time) for time in times]
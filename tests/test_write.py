@@ -0,0 +1,33 @@
+import shutil
+
+import cv2
+import pytest
+
+def frames(file) -> list:
+    capture = cv2.VideoCapture(file)
+    frames = []
+    while (frame := capture.read()[1]) is not None:
+        frames.append(frame)
+    capture.release()
+    return frames
+
+def test_refuses_codec_the_container_cannot_take(convertor, tmp_path):
+    with pytest.raises(ValueError):
+        convertor().write(str(tmp_path / 'out.mp4'), 1, 'HFYU')
+
+@pytest.mark.parametrize('fourcc', ['FFV1', 'HFYU', 'mp4v'])
+def test_refuses_segments_that_cannot_be_joined(convertor, tmp_path, fourcc):
+    with pytest.raises(ValueError):
+        convertor().write(str(tmp_path / 'out.mp4'), 3, fourcc)
+    assert not any(tmp_path.iterdir())
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='stitching segments needs ffmpeg')
+@pytest.mark.parametrize('fourcc, ext', [('FFV1', '.mkv'), ('HFYU', '.avi'), ('MPNG', '.mp4')])
+def test_segments_match_sequential(convertor, tmp_path, fourcc, ext):
+    sequential, segmented = str(tmp_path / f'sequential{ext}'), str(tmp_path / f'segmented{ext}')
+    convertor().write(sequential, 1, fourcc)
+    convertor().write(segmented, 3, fourcc)
+
+    expected = frames(sequential)
+    assert len(expected) > 100
+    assert all((a == b).all() for a, b in zip(frames(segmented), expected, strict=True))